@@ -68,7 +68,7 @@ async def send_message_to_agent(request: Request):
             raise HTTPException(status_code=400, detail="session_id and message are required")
         
         # Send message to agent
-        agent_response = agent_service.send_message(session_id, message)
+        agent_response = await agent_service.asend_message(session_id, message)
         
         return {
             "success": True,
@@ -1,16 +1,28 @@
 from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 from typing import Dict, List, Any, Optional
 from pydantic import BaseModel, Field
+import asyncio
 import logging
+from tempfile import SpooledTemporaryFile
 
-from app.services.contract_service import contract_service
+from app.services.contract_service import contract_service, ContractNotFoundError, shutdown_pdf_pool
 from app.models.negotiation_models import ContractStatus
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/contracts", tags=["contracts"])
 
+# Registered on the router so every app that mounts it stops the PDF workers on shutdown
+router.add_event_handler("shutdown", shutdown_pdf_pool)
+
+# Generated PDFs stay in memory up to this size before spilling to a temp file
+PDF_SPOOL_MAX_MEMORY = 1024 * 1024
+PDF_STREAM_CHUNK_SIZE = 64 * 1024
+
+class BulkContractPdfRequest(BaseModel):
+    contract_ids: List[str] = Field(..., min_length=1, description="IDs of the contracts to export into one PDF")
+
 class SignContractRequest(BaseModel):
     signer_type: str = Field(..., pattern="^(brand|influencer)$", description="Type of signer: 'brand' or 'influencer'")
     signer_name: str = Field(..., min_length=1, description="Name of the person signing")
@@ -47,7 +59,7 @@ async def view_contract_html(contract_id: str) -> Dict[str, Any]:
             "status": contract.status.value if contract else "unknown",
             "ready_for_signatures": contract.status == ContractStatus.PENDING_SIGNATURES if contract else False
         }
-    except ValueError as e:
+    except ContractNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         logger.error(f"Error generating contract HTML: {e}")
@@ -58,7 +70,7 @@ async def download_contract_pdf(contract_id: str):
     """Download contract as PDF"""
     try:
         # Generate PDF bytes
-        pdf_bytes = contract_service.generate_contract_pdf(contract_id)
+        pdf_bytes = await contract_service.generate_contract_pdf_async(contract_id)
         
         # Get contract for filename
         contract = contract_service.get_contract(contract_id)
@@ -77,12 +89,39 @@ async def download_contract_pdf(contract_id: str):
             }
         )
         
-    except ValueError as e:
+    except HTTPException:
+        raise
+    except ContractNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         logger.error(f"Error generating PDF for contract {contract_id}: {e}")
         raise HTTPException(status_code=500, detail="Error generating PDF")
 
+@router.post("/pdf/bulk")
+async def download_contracts_pdf_bulk(request: BulkContractPdfRequest):
+    """Download several contracts as a single PDF"""
+    # Bulk PDFs can be large: spill to disk past the limit and stream instead of holding bytes
+    pdf_file = SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_MEMORY)
+    try:
+        await asyncio.to_thread(contract_service.write_contracts_pdf_bulk, request.contract_ids, pdf_file)
+        pdf_file.seek(0)
+    except ContractNotFoundError as e:
+        pdf_file.close()
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        pdf_file.close()
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        pdf_file.close()
+        logger.error(f"Error generating bulk PDF for contracts {request.contract_ids}: {e}")
+        raise HTTPException(status_code=500, detail="Error generating PDF")
+    
+    return StreamingResponse(
+        _iter_file(pdf_file),
+        media_type="application/pdf",
+        headers={"Content-Disposition": "attachment; filename=contracts_export.pdf"}
+    )
+
 @router.post("/{contract_id}/sign")
 async def sign_contract(contract_id: str, request: SignContractRequest, http_request: Request) -> Dict[str, Any]:
     """Sign a contract digitally"""
@@ -111,6 +150,8 @@ async def sign_contract(contract_id: str, request: SignContractRequest, http_req
             }
         }
         
+    except ContractNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -186,3 +227,11 @@ def _get_status_breakdown(contracts: List[Dict[str, Any]]) -> Dict[str, int]:
         status = contract["status"]
         status_count[status] = status_count.get(status, 0) + 1
     return status_count
+
+def _iter_file(file_obj):
+    """Yield a file's contents in chunks, closing it once fully sent"""
+    try:
+        while chunk := file_obj.read(PDF_STREAM_CHUNK_SIZE):
+            yield chunk
+    finally:
+        file_obj.close()
@@ -0,0 +1,40 @@
+# Contract PDF rendering, importing nothing from the app so spawned PDF worker processes load only this module
+
+from io import BytesIO
+from typing import IO
+
+from weasyprint import CSS, HTML
+
+# Contract stylesheet: inlined into HTML for viewing, parsed once as a WeasyPrint CSS object for PDFs
+CONTRACT_CSS_STR = """
+body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 800px; margin: 0 auto; padding: 20px; }
+.header { text-align: center; border-bottom: 2px solid #333; padding-bottom: 20px; margin-bottom: 30px; }
+.section { margin: 20px 0; }
+.section-title { font-size: 18px; font-weight: bold; color: #2c3e50; margin-bottom: 10px; border-bottom: 1px solid #eee; padding-bottom: 5px; }
+.deliverables-table { width: 100%; border-collapse: collapse; margin: 15px 0; }
+.deliverables-table th, .deliverables-table td { border: 1px solid #ddd; padding: 8px; text-align: left; }
+.deliverables-table th { background-color: #f2f2f2; font-weight: bold; }
+.signature-section { margin-top: 40px; }
+.signature-line { border-bottom: 1px solid #333; width: 300px; height: 30px; margin: 10px 0; }
+.contract-meta { background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin: 20px 0; }
+.status-badge { display: inline-block; padding: 5px 10px; border-radius: 15px; color: white; font-size: 12px; }
+.status-pending { background-color: #ffc107; }
+.status-signed { background-color: #28a745; }
+.status-executed { background-color: #007bff; }
+.highlight { background-color: #fff3cd; padding: 10px; border-left: 4px solid #ffc107; margin: 10px 0; }
+"""
+
+# Parsed once per process; PDF renders skip the inline <style> and apply this instead
+_CONTRACT_CSS = CSS(string=CONTRACT_CSS_STR)
+
+
+def write_pdf(html_content: str, target: IO[bytes]) -> None:
+    """Render contract HTML as a PDF into a binary file object"""
+    HTML(string=html_content).write_pdf(target, stylesheets=[_CONTRACT_CSS])
+
+
+def render_pdf(html_content: str) -> bytes:
+    """Render contract HTML to PDF bytes (top-level so it can run in a worker process)"""
+    pdf_buffer = BytesIO()
+    write_pdf(html_content, pdf_buffer)
+    return pdf_buffer.getvalue()
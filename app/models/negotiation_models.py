@@ -1,5 +1,6 @@
 from typing import Dict, List, Optional
 from dataclasses import dataclass, field
+from functools import cached_property
 from enum import Enum
 from datetime import datetime
 
@@ -10,6 +11,9 @@ class PlatformType(str, Enum):
     TIKTOK = "tiktok"
     TWITTER = "twitter"
 
+# Display names for platforms in messages, built once
+_PLATFORM_TITLE = {p: p.value.title() for p in PlatformType}
+
 class ContentType(str, Enum):
     # Instagram
     INSTAGRAM_POST = "post"
@@ -31,6 +35,8 @@ class ContentType(str, Enum):
     TWITTER_POST = "post"
     TWITTER_VIDEO = "video"
 
+_CONTENT_TYPE_TITLE = {c: c.value.replace('_', ' ').title() for c in ContentType}
+
 class LocationType(str, Enum):
     US = "US"
     UK = "UK"
@@ -61,6 +67,11 @@ class InfluencerProfile:
     platforms: List[PlatformType]  # Platforms the influencer is active on
     niches: List[str] = field(default_factory=list)  # Influencer's content niches
     previous_brand_collaborations: int = 0  # Number of previous brand collaborations
+
+    @cached_property
+    def platforms_display(self) -> str:
+        """Comma-separated platform names for messages, computed once per profile"""
+        return ", ".join(_PLATFORM_TITLE[p] for p in self.platforms)
     
 @dataclass
 class BrandDetails:
@@ -76,6 +87,16 @@ class BrandDetails:
     brand_location: Optional[LocationType] = None  # Brand's location for currency handling
     budget_currency: Optional[str] = None  # Currency for the budget (e.g., "USD", "INR", "EUR")
     original_budget_amount: Optional[float] = None  # Original budget amount in original currency
+
+    @cached_property
+    def target_platforms_str(self) -> str:
+        """Comma-separated platform values, computed once per brand (platforms are fixed after load)"""
+        return ", ".join(p.value for p in self.target_platforms)
+
+    @cached_property
+    def target_platforms_display(self) -> str:
+        """Comma-separated platform names for messages, computed once per brand"""
+        return ", ".join(_PLATFORM_TITLE[p] for p in self.target_platforms)
     
 @dataclass
 class ContentDeliverable:
@@ -190,3 +211,5 @@ class ContractTerms:
     dispute_resolution: Optional[str] = None
     governing_law: Optional[str] = None
     legal_terms: Optional[str] = None
+    # Total converted and formatted in the contract currency, cached when the contract is generated
+    total_amount_formatted: Optional[str] = None
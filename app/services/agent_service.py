@@ -1,38 +1,71 @@
 import os
+import asyncio
 import logging
-from typing import Dict, Optional, Any
-from app.core.config import settings
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Optional, Tuple
+from app.services.gemini_client import get_gemini_client
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Reply used when Gemini fails mid-conversation
+FALLBACK_REPLY = "I had a brief technical issue. Could you please repeat what you were saying about the Instagram deal?"
+
+
+class _MockResponse:
+    """Minimal stand-in for a Gemini response in mock mode"""
+    __slots__ = ("text",)
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _MockChat:
+    """Stateless mock chat, shared by every session when Gemini is unavailable"""
+    __slots__ = ()
+
+    def send_message(self, msg: str) -> _MockResponse:
+        return _MockResponse(
+            f'This is a mock AI response to: "{msg}". In a real scenario, I would negotiate the Instagram deal professionally.'
+        )
+
+
+_MOCK_CHAT_SINGLETON = _MockChat()
+
+# Number of (role, text) entries kept per session and replayed to Gemini as context
+HISTORY_WINDOW_SIZE = 10
+
+
+@dataclass(slots=True)
+class SessionState:
+    """Conversation state kept per session: only the most recent turns, not the full transcript"""
+    window: Deque[Tuple[str, str]] = field(default_factory=lambda: deque(maxlen=HISTORY_WINDOW_SIZE))
+    # One turn at a time per session, so concurrent messages can't interleave or read a half-updated window
+    turn_lock: threading.Lock = field(default_factory=threading.Lock)
+
 class AgentService:
     """Service for handling AI agent conversations using Google Gemini"""
     
+    # Greeting message for starting conversations, pre-encoded for the voice pipeline
+    GREETING_TEXT = "Hello! I'm your negotiation agent for Instagram marketing deals. I'm here to discuss a potential partnership with Mama Earth for Instagram post endorsements. I'm listening - please tell me your thoughts on this opportunity."
+    GREETING_BYTES = GREETING_TEXT.encode("utf-8")
+    
     def __init__(self):
-        # Configuration from settings - with fallback for MVP
-        self.google_api_key = settings.google_api_key or "dummy_key"
-        
-        # Initialize Gemini client only if we have real credentials
-        self.gemini_client = None
+        # Shared Gemini client (None in mock mode, e.g. without a Google API key)
+        self.gemini_client = get_gemini_client()
         
-        if settings.google_api_key:
-            try:
-                from google import genai
-                self.gemini_client = genai.Client(api_key=self.google_api_key)
-                logger.info("Agent service initialized with real Gemini credentials")
-            except ImportError as e:
-                logger.warning(f"Missing dependencies for agent service: {e}")
-            except Exception as e:
-                logger.warning(f"Failed to initialize agent service: {e}")
+        if self.gemini_client:
+            logger.info("Agent service initialized with real Gemini credentials")
         else:
-            logger.warning("Agent service running in mock mode - missing Google API key")
+            logger.warning("Agent service running in mock mode - Gemini client unavailable")
         
         # Model configuration
         self.model_name = "gemini-2.0-flash"
         
-        # In-memory store of session_id → Gemini chat session
-        self.chat_sessions: Dict[str, Any] = {}
+        # In-memory store of session_id → recent conversation window
+        self.chat_sessions: Dict[str, SessionState] = {}
         
         # System prompt for negotiations
         self.system_prompt = """You are a professional negotiation agent for influencer marketing deals. 
@@ -60,60 +93,88 @@ IMPORTANT: You may be speaking with people who use Indian English. Be patient an
 
 Always be respectful and adapt to their communication style while staying focused on the Instagram deal negotiation."""
 
-        # Greeting message for starting conversations
-        self.greeting_message = "Hello! I'm your negotiation agent for Instagram marketing deals. I'm here to discuss a potential partnership with Mama Earth for Instagram post endorsements. I'm listening - please tell me your thoughts on this opportunity."
-
-    def create_chat_session(self, session_id: str) -> Any:
-        """Create a new Gemini chat session"""
+    def create_chat_session(self, session_id: str) -> SessionState:
+        """Create a new chat session"""
         if not self.gemini_client:
             logger.warning(f"Creating mock chat session for {session_id} - no Gemini client available")
-            mock_chat = type('MockChat', (), {
-                'send_message': lambda msg: type('MockResponse', (), {
-                    'text': f'This is a mock AI response to: "{msg}". In a real scenario, I would negotiate the Instagram deal professionally.'
-                })()
-            })()
-            self.chat_sessions[session_id] = mock_chat
-            return mock_chat
-            
-        try:
-            chat = self.gemini_client.chats.create(model=self.model_name)
-            # Initialize the chat with the system prompt
-            chat.send_message(self.system_prompt)
-            self.chat_sessions[session_id] = chat
+        else:
             logger.info(f"Created new chat session for session_id: {session_id}")
-            return chat
-        except Exception as e:
-            logger.error(f"Error creating chat session: {e}")
-            raise
+        
+        session = SessionState()
+        self.chat_sessions[session_id] = session
+        return session
 
-    def get_chat_session(self, session_id: str) -> Optional[Any]:
+    def get_chat_session(self, session_id: str) -> Optional[SessionState]:
         """Get existing chat session"""
         return self.chat_sessions.get(session_id)
 
+    def _generate_reply(self, session: SessionState, message: str) -> str:
+        """Ask Gemini for a reply given the session's recent turns plus the new message"""
+        if not self.gemini_client:
+            return _MOCK_CHAT_SINGLETON.send_message(message).text
+        
+        with session.turn_lock:
+            contents = [{"role": role, "parts": [{"text": text}]} for role, text in session.window]
+            contents.append({"role": "user", "parts": [{"text": message}]})
+            
+            response = self.gemini_client.models.generate_content(
+                model=self.model_name,
+                contents=contents,
+                config={"system_instruction": self.system_prompt}
+            )
+            reply_text = response.text
+            
+            session.window.append(("user", message))
+            session.window.append(("model", reply_text))
+            return reply_text
+
     def send_message(self, session_id: str, message: str) -> str:
         """Send a message to the AI agent and get response"""
         logger.info(f"Processing message for session {session_id}: {message}")
         
         # Get or create chat session
-        chat = self.get_chat_session(session_id)
-        if chat is None:
-            chat = self.create_chat_session(session_id)
+        session = self.get_chat_session(session_id)
+        if session is None:
+            session = self.create_chat_session(session_id)
         
         try:
             # Send message to Gemini and get response
-            response = chat.send_message(message)
-            reply_text = response.text
+            reply_text = self._generate_reply(session, message)
+            logger.info(f"Agent reply for session {session_id}: {reply_text}")
+            return reply_text
+            
+        except Exception as e:
+            logger.error(f"Error sending message to agent: {e}")
+            # Return a fallback response
+            return FALLBACK_REPLY
+
+    async def asend_message(self, session_id: str, message: str) -> str:
+        """Async variant of send_message; the blocking Gemini call runs in a worker thread"""
+        logger.info(f"Processing message for session {session_id}: {message}")
+        
+        # Get or create chat session
+        session = self.get_chat_session(session_id)
+        if session is None:
+            session = self.create_chat_session(session_id)
+        
+        try:
+            # Let other requests proceed on the event loop while Gemini responds
+            reply_text = await asyncio.to_thread(self._generate_reply, session, message)
             logger.info(f"Agent reply for session {session_id}: {reply_text}")
             return reply_text
             
         except Exception as e:
             logger.error(f"Error sending message to agent: {e}")
             # Return a fallback response
-            return "I had a brief technical issue. Could you please repeat what you were saying about the Instagram deal?"
+            return FALLBACK_REPLY
 
     def get_greeting_message(self) -> str:
         """Get the initial greeting message for new conversations"""
-        return self.greeting_message
+        return self.GREETING_TEXT
+
+    def get_greeting_bytes(self) -> bytes:
+        """Get the initial greeting as UTF-8 bytes, encoded once at import"""
+        return self.GREETING_BYTES
 
     def end_session(self, session_id: str):
         """Clean up chat session"""
@@ -1,38 +1,63 @@
+import asyncio
 import json
-import google.generativeai as genai
-from typing import Dict, Any, Optional
-from decouple import config
+import logging
+import threading
+import time
+from typing import Dict, Any, List, Optional, Set, Tuple
 from app.models.influencer import SearchFilters, PlatformType
+from app.services.gemini_client import get_gemini_client
 
-class AIQueryParser:
-    def __init__(self):
-        # Configure Gemini API
-        genai.configure(api_key=config("GOOGLE_API_KEY"))
-        self.model = genai.GenerativeModel('gemini-2.0-flash')
-    
-    async def parse_query(self, query: str) -> SearchFilters:
-        """
-        Parse natural language query into structured search filters using Gemini AI
-        """
-        prompt = self._create_parsing_prompt(query)
-        
-        try:
-            response = self.model.generate_content(prompt)
-            parsed_data = self._extract_json_from_response(response.text)
-            return self._create_search_filters(parsed_data)
-        except Exception as e:
-            print(f"Error parsing query with AI: {e}")
-            return SearchFilters()
-    
-    def _create_parsing_prompt(self, query: str) -> str:
-        return f"""
-You are an expert AI assistant that extracts search parameters from natural language queries for influencer search. You must handle complex comparison operators and nuanced language.
+logger = logging.getLogger(__name__)
 
-Extract the following information from the user query and return ONLY a valid JSON object:
+_MODEL_NAME = "gemini-2.0-flash"
+
+# Parse-failure warnings logged per second before further ones are dropped
+_ERROR_LOG_RATE = 10
+_LOG_SNIPPET_CHARS = 256
+
+# Concurrent parse_query calls arriving within this window are sent to Gemini as one request
+_BATCH_MAX_SIZE = 8
+_BATCH_WINDOW_SECONDS = 0.02
+# Batches in flight to Gemini at once; further queries keep queueing and form larger batches
+_MAX_CONCURRENT_BATCHES = 4
+
+# SearchFilters fields copied straight from the parsed AI output, with their casts
+_SEARCH_FILTER_FIELDS = (
+    ("location", str),
+    ("niche", str),
+    ("followers_min", int),
+    ("followers_max", int),
+    ("price_min", int),
+    ("price_max", int),
+    ("engagement_min", float),
+    ("engagement_max", float),
+    ("verified_only", bool),
+)
+
+# Gemini structured-output schema mirroring the fields above, so replies are always valid JSON
+_SCHEMA_TYPES = {str: "STRING", int: "INTEGER", float: "NUMBER", bool: "BOOLEAN"}
+
+_SEARCH_FILTER_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "platform": {"type": "STRING"},
+        **{key: {"type": _SCHEMA_TYPES[cast]} for key, cast in _SEARCH_FILTER_FIELDS},
+    },
+}
+
+_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": _SEARCH_FILTER_SCHEMA,
+}
 
-Query: "{query}"
+_BATCH_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": {"type": "ARRAY", "items": _SEARCH_FILTER_SCHEMA},
+}
 
-Extract these parameters:
+_PROMPT_INTRO = "You are an expert AI assistant that extracts search parameters from natural language queries for influencer search. You must handle complex comparison operators and nuanced language."
+
+_PARSING_RULES = """Extract these parameters:
 - location: string (city, country, region mentioned)
 - niche: string (fashion, tech, fitness, beauty, food, travel, gaming, lifestyle, etc.)
 - platform: string (instagram, youtube, tiktok, twitter, linkedin, facebook)
@@ -85,115 +110,226 @@ CRITICAL PARSING RULES:
    - "SF", "San Francisco" → "San Francisco"
 
 COMPLEX EXAMPLES:
-- "Fashion influencers with more than 100k followers but less than 500k" → {{"niche": "fashion", "followers_min": 100000, "followers_max": 500000}}
-- "YouTubers over 1M subscribers under $2000 per video" → {{"platform": "youtube", "followers_min": 1000000, "price_max": 2000}}
-- "Tech creators with at least 50k followers and high engagement" → {{"niche": "tech", "followers_min": 50000, "engagement_min": 4.0}}
-- "Beauty influencers under 200k followers with excellent engagement rates" → {{"niche": "beauty", "followers_max": 200000, "engagement_min": 5.0}}
-- "Instagram users in NYC with 10k+ followers below $300" → {{"platform": "instagram", "location": "New York", "followers_min": 10000, "price_max": 300}}
-- "Fitness creators with fewer than 100k but more than 25k followers" → {{"niche": "fitness", "followers_min": 25000, "followers_max": 100000}}
-- "Dance influencers from Hyderabad with 50k followers or less" → {{"niche": "dance", "location": "Hyderabad", "followers_max": 50000}}
-- "Travel bloggers with 20k or fewer followers" → {{"niche": "travel", "followers_max": 20000}}
-- "Micro influencers with 10k followers or less" → {{"followers_max": 10000}}
-- "Small creators under 5k followers" → {{"followers_max": 5000}}
-- "Budget influencers for $100 or less per post" → {{"price_max": 100}}
+- "Fashion influencers with more than 100k followers but less than 500k" → {"niche": "fashion", "followers_min": 100000, "followers_max": 500000}
+- "YouTubers over 1M subscribers under $2000 per video" → {"platform": "youtube", "followers_min": 1000000, "price_max": 2000}
+- "Tech creators with at least 50k followers and high engagement" → {"niche": "tech", "followers_min": 50000, "engagement_min": 4.0}
+- "Beauty influencers under 200k followers with excellent engagement rates" → {"niche": "beauty", "followers_max": 200000, "engagement_min": 5.0}
+- "Instagram users in NYC with 10k+ followers below $300" → {"platform": "instagram", "location": "New York", "followers_min": 10000, "price_max": 300}
+- "Fitness creators with fewer than 100k but more than 25k followers" → {"niche": "fitness", "followers_min": 25000, "followers_max": 100000}
+- "Dance influencers from Hyderabad with 50k followers or less" → {"niche": "dance", "location": "Hyderabad", "followers_max": 50000}
+- "Travel bloggers with 20k or fewer followers" → {"niche": "travel", "followers_max": 20000}
+- "Micro influencers with 10k followers or less" → {"followers_max": 10000}
+- "Small creators under 5k followers" → {"followers_max": 5000}
+- "Budget influencers for $100 or less per post" → {"price_max": 100}
 
 IMPORTANT:
 - Return ONLY valid JSON, no explanations or extra text
 - Handle all comparison operators correctly
 - Understand context and implied meanings
-- Be precise with min/max assignments based on comparison words
+- Be precise with min/max assignments based on comparison words"""
+
+# Prompt templates are assembled once at import; only the query text is substituted per call
+_ESCAPED_PARSING_RULES = _PARSING_RULES.replace("{", "{{").replace("}", "}}")
+
+_PROMPT_TEMPLATE = f"""
+{_PROMPT_INTRO}
+
+Extract the following information from the user query and return ONLY a valid JSON object:
+
+Query: "{{query}}"
+
+{_ESCAPED_PARSING_RULES}
 
 JSON:
 """
+
+_BATCH_PROMPT_TEMPLATE = f"""
+{_PROMPT_INTRO}
+
+Extract the following information from each numbered user query below. Treat every query independently and return ONLY a valid JSON array containing exactly one object per query, in the same order:
+
+Queries:
+{{queries}}
+
+{_ESCAPED_PARSING_RULES}
+
+JSON:
+"""
+
+class _ErrorLogLimiter:
+    """Token bucket that caps how often parse failures are logged"""
+    __slots__ = ("rate", "tokens", "updated", "_lock")
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        # Parse errors can be reported from worker threads, so refill and take happen atomically
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+_ERR_BUCKET = _ErrorLogLimiter(_ERROR_LOG_RATE)
+
+class AIQueryParser:
+    def __init__(self):
+        # Batching state, bound to the event loop that first calls parse_query
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._batch_slots: Optional[asyncio.Semaphore] = None
+        # Strong references to in-flight batches, which the event loop only holds weakly
+        self._batch_tasks: Set[asyncio.Task] = set()
     
-    def _extract_json_from_response(self, response_text: str) -> Dict[str, Any]:
-        """Extract JSON from AI response text with enhanced parsing"""
+    async def _generate(self, prompt: str, generation_config: Dict[str, Any]) -> str:
+        """Send a prompt through the shared Gemini client and return the response text"""
+        client = get_gemini_client()
+        if client is None:
+            raise RuntimeError("Gemini client is not configured")
+        
+        response = await client.aio.models.generate_content(
+            model=_MODEL_NAME,
+            contents=prompt,
+            config=generation_config
+        )
+        return response.text
+    
+    async def parse_query(self, query: str) -> SearchFilters:
+        """
+        Parse natural language query into structured search filters using Gemini AI
+        """
         try:
-            # Clean the response text
-            response_text = response_text.strip()
+            parsed_data = await self._submit(query)
+            return self._create_search_filters(parsed_data)
+        except Exception:
+            if _ERR_BUCKET.allow():
+                logger.warning("Error parsing query with AI", exc_info=True, extra={"query": query[:_LOG_SNIPPET_CHARS]})
+            return SearchFilters()
+    
+    async def _submit(self, query: str) -> Dict[str, Any]:
+        """Queue a query for the batch worker and wait for its parsed data"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._batch_slots = asyncio.Semaphore(_MAX_CONCURRENT_BATCHES)
+            self._worker = loop.create_task(self._batch_worker(self._queue, self._batch_slots))
+        
+        future = loop.create_future()
+        await self._queue.put((query, future))
+        return await future
+    
+    async def _batch_worker(self, queue: asyncio.Queue, batch_slots: asyncio.Semaphore):
+        """Collect up to _BATCH_MAX_SIZE queries or wait _BATCH_WINDOW_SECONDS, then parse them together"""
+        loop = asyncio.get_running_loop()
+        while True:
+            # Wait for a free slot first, so queries arriving meanwhile join the next batch
+            await batch_slots.acquire()
+            batch = [await queue.get()]
+            deadline = loop.time() + _BATCH_WINDOW_SECONDS
             
-            # Try to find JSON block markers first
-            json_markers = ['```json', '```', 'JSON:', 'json:']
-            for marker in json_markers:
-                if marker in response_text:
-                    # Extract content after the marker
-                    start_idx = response_text.find(marker) + len(marker)
-                    response_text = response_text[start_idx:].strip()
-                    # Remove closing markers
-                    if response_text.endswith('```'):
-                        response_text = response_text[:-3].strip()
+            while len(batch) < _BATCH_MAX_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
                     break
             
-            # Find the JSON object boundaries
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-            
-            if start_idx != -1 and end_idx != 0:
-                json_str = response_text[start_idx:end_idx]
-                
-                # Clean up common JSON formatting issues
-                json_str = json_str.replace('\n', ' ').replace('\t', ' ')
-                # Fix common AI response issues
-                json_str = json_str.replace('{{', '{').replace('}}', '}')
-                
-                parsed_json = json.loads(json_str)
-                
-                # Validate that it's a proper dictionary
-                if isinstance(parsed_json, dict):
-                    return parsed_json
-            
-            # Fallback: try to parse the entire response as JSON
-            return json.loads(response_text)
-            
-        except json.JSONDecodeError as e:
-            print(f"JSON parsing error: {e}")
-            print(f"Response text: {response_text}")
-            return {}
+            task = loop.create_task(self._run_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+            task.add_done_callback(lambda _: batch_slots.release())
+    
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Resolve every future in the batch, falling back to per-query requests if the batch reply is unusable"""
+        queries = [query for query, _ in batch]
+        
+        try:
+            if len(queries) == 1:
+                results = [await self._parse_single(queries[0])]
+            else:
+                try:
+                    response_text = await self._generate(
+                        self._create_batch_parsing_prompt(queries),
+                        _BATCH_GENERATION_CONFIG
+                    )
+                    results = self._extract_json_array_from_response(response_text, len(queries))
+                except Exception:
+                    if _ERR_BUCKET.allow():
+                        logger.warning("Batched query parsing failed, retrying individually", exc_info=True)
+                    results = await asyncio.gather(
+                        *(self._parse_single(query) for query in queries),
+                        return_exceptions=True
+                    )
         except Exception as e:
-            print(f"Unexpected error in JSON extraction: {e}")
+            results = [e] * len(batch)
+        
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+    
+    async def _parse_single(self, query: str) -> Dict[str, Any]:
+        response_text = await self._generate(self._create_parsing_prompt(query), _GENERATION_CONFIG)
+        return self._extract_json_from_response(response_text)
+    
+    def _create_parsing_prompt(self, query: str) -> str:
+        return _PROMPT_TEMPLATE.format_map({"query": query})
+
+    def _create_batch_parsing_prompt(self, queries: List[str]) -> str:
+        numbered_queries = "\n".join(f'{i}. "{query}"' for i, query in enumerate(queries, 1))
+        return _BATCH_PROMPT_TEMPLATE.format_map({"queries": numbered_queries})
+    
+    def _extract_json_from_response(self, response_text: str) -> Dict[str, Any]:
+        """Decode the structured JSON object returned by Gemini"""
+        try:
+            parsed_json = json.loads(response_text)
+        except json.JSONDecodeError:
+            if _ERR_BUCKET.allow():
+                logger.warning("JSON parse failed", exc_info=True, extra={"snippet": response_text[:_LOG_SNIPPET_CHARS]})
             return {}
+        
+        return parsed_json if isinstance(parsed_json, dict) else {}
+    
+    def _extract_json_array_from_response(self, response_text: str, expected_length: int) -> List[Dict[str, Any]]:
+        """Decode the per-query JSON objects from a batched structured response"""
+        parsed_json = json.loads(response_text)
+        if not isinstance(parsed_json, list) or len(parsed_json) != expected_length:
+            raise ValueError(f"Expected a JSON array of {expected_length} objects")
+        
+        return [item if isinstance(item, dict) else {} for item in parsed_json]
     
     def _create_search_filters(self, parsed_data: Dict[str, Any]) -> SearchFilters:
         """Convert parsed data to SearchFilters model"""
-        filters = {}
-        
-        # Map parsed data to SearchFilters fields
-        if "location" in parsed_data:
-            filters["location"] = parsed_data["location"]
-        
-        if "niche" in parsed_data:
-            filters["niche"] = parsed_data["niche"]
+        get = parsed_data.get
+        filters = {
+            key: cast(value)
+            for key, cast in _SEARCH_FILTER_FIELDS
+            if (value := get(key)) is not None
+        }
         
-        if "platform" in parsed_data:
-            platform_str = parsed_data["platform"].lower()
+        platform_str = get("platform")
+        if platform_str:
             try:
-                filters["platform"] = PlatformType(platform_str)
+                filters["platform"] = PlatformType(str(platform_str).lower())
             except ValueError:
                 pass  # Skip invalid platform
         
-        if "followers_min" in parsed_data:
-            filters["followers_min"] = int(parsed_data["followers_min"])
-        else:
-            filters["followers_min"] = 1000
-        
-        if "followers_max" in parsed_data:
-            filters["followers_max"] = int(parsed_data["followers_max"])
-
-            
-        if "price_min" in parsed_data:
-            filters["price_min"] = int(parsed_data["price_min"])
-        
-        if "price_max" in parsed_data:
-            filters["price_max"] = int(parsed_data["price_max"])
-        
-        if "engagement_min" in parsed_data:
-            filters["engagement_min"] = float(parsed_data["engagement_min"])
-        
-        if "engagement_max" in parsed_data:
-            filters["engagement_max"] = float(parsed_data["engagement_max"])
-        
-        if "verified_only" in parsed_data:
-            filters["verified_only"] = bool(parsed_data["verified_only"])
+        filters.setdefault("followers_min", 1000)
         
         return SearchFilters(**filters)
 
@@ -1,12 +1,21 @@
 import os
-import uuid
+import secrets
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import logging
-from typing import Dict, Optional, Any, List
+import threading
+import time
+from typing import IO, Dict, Mapping, Optional, Any, List, Tuple
+from types import MappingProxyType
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 import json
-from jinja2 import Template
-from weasyprint import HTML
+import re
+import tempfile
+from jinja2 import Environment, DictLoader, FileSystemBytecodeCache
 from io import BytesIO
 from enum import Enum
 
@@ -14,11 +23,483 @@ from app.models.negotiation_models import (
     ContractTerms, ContractStatus, DigitalSignature, 
     NegotiationState, ContentDeliverable,
     BrandDetails, InfluencerProfile, NegotiationOffer,
-    PlatformType, ContentType, LocationType
+    PlatformType, ContentType, LocationType,
+    _PLATFORM_TITLE, _CONTENT_TYPE_TITLE
 )
+from app.core.contract_pdf import CONTRACT_CSS_STR, render_pdf, write_pdf
 
 logger = logging.getLogger(__name__)
 
+# HTML template for contract generation
+_CONTRACT_TEMPLATE_STR = """
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>Influencer Marketing Agreement - {{contract.contract_id}}</title>
+    {% if embed_styles %}
+    <style>
+{% include "contract.css" %}
+    </style>
+    {% endif %}
+</head>
+<body>
+    <div class="header">
+        <h1>INFLUENCER MARKETING AGREEMENT</h1>
+        <p><strong>Contract ID:</strong> {{contract.contract_id}}</p>
+        <p><strong>Date:</strong> {{contract_date_formatted}}</p>
+        <span class="status-badge {{status_badge_class}}">
+            {{contract.status.value.replace('_', ' ').title()}}
+        </span>
+    </div>
+
+    <div class="contract-meta">
+        <h3>📋 Agreement Overview</h3>
+        <p><strong>Campaign:</strong> {{contract.campaign_title}}</p>
+        <p><strong>Total Investment:</strong> {{total_formatted}}</p>
+        <p><strong>Campaign Period:</strong> {{campaign_start_formatted}} to {{campaign_end_formatted}}</p>
+    </div>
+
+    <div class="section">
+        <div class="section-title">1. PARTIES</div>
+        <p><strong>Brand ("Client"):</strong><br>
+        {{contract.brand_name}}<br>
+        Contact: {{contract.brand_contact_name}}<br>
+        Email: {{contract.brand_contact_email}}</p>
+        
+        <p><strong>Influencer ("Creator"):</strong><br>
+        {{contract.influencer_name}}<br>
+        Email: {{contract.influencer_email}}<br>
+        Contact: {{contract.influencer_contact}}</p>
+    </div>
+
+    <div class="section">
+        <div class="section-title">2. CAMPAIGN DETAILS</div>
+        <p><strong>Campaign Description:</strong> {{contract.campaign_description}}</p>
+        <p><strong>Campaign Duration:</strong> {{campaign_start_formatted}} to {{campaign_end_formatted}}</p>
+    </div>
+
+    <div class="section">
+        <div class="section-title">3. DELIVERABLES & COMPENSATION</div>
+        <table class="deliverables-table">
+            <thead>
+                <tr>
+                    <th>#</th>
+                    <th>Platform</th>
+                    <th>Content Type</th>
+                    <th>Quantity</th>
+                    <th>Amount</th>
+                </tr>
+            </thead>
+            <tbody>
+                {% for index, platform, content_type, quantity, price_formatted in rows %}
+                <tr>
+                    <td>{{index}}</td>
+                    <td>{{platform}}</td>
+                    <td>{{content_type}}</td>
+                    <td>{{quantity}}</td>
+                    <td>{{price_formatted}}</td>
+                </tr>
+                {% endfor %}
+            </tbody>
+            <tfoot>
+                <tr style="font-weight: bold; background-color: #f8f9fa;">
+                    <td colspan="4">TOTAL COMPENSATION</td>
+                    <td>{{total_formatted}}</td>
+                </tr>
+            </tfoot>
+        </table>
+    </div>
+
+    <div class="section">
+        <div class="section-title">4. PAYMENT TERMS</div>
+        <p>{{contract.payment_terms}}</p>
+        <p><strong>Currency:</strong> {{contract.currency}}</p>
+    </div>
+
+    <div class="section">
+        <div class="section-title">5. CONTENT REQUIREMENTS</div>
+        <p><strong>Revisions Included:</strong> {{contract.revisions_included}} rounds of revisions</p>
+        <p><strong>Usage Rights:</strong> {{contract.usage_rights}}</p>
+        {% if contract.exclusivity_period_days %}
+        <p><strong>Exclusivity Period:</strong> {{contract.exclusivity_period_days}} days</p>
+        {% endif %}
+    </div>
+
+    <div class="section">
+        <div class="section-title">6. LEGAL TERMS</div>
+        <p><strong>Cancellation Policy:</strong></p>
+        <div class="highlight">{{contract.cancellation_policy}}</div>
+        
+        <p><strong>Dispute Resolution:</strong></p>
+        <div class="highlight">{{contract.dispute_resolution}}</div>
+        
+        <p><strong>Governing Law:</strong> {{contract.governing_law}}</p>
+    </div>
+
+    <div class="signature-section">
+        <div class="section-title">7. SIGNATURES</div>
+        
+        <div style="display: flex; justify-content: space-between; margin-top: 30px;">
+            <div style="width: 45%;">
+                <h4>BRAND REPRESENTATIVE</h4>
+                {% if contract.brand_signature %}
+                <p><strong>✓ Signed digitally by:</strong> {{contract.brand_signature.signer_name}}</p>
+                <p><strong>Date:</strong> {{contract.brand_signature.signature_timestamp.strftime(signature_ts_format)}}</p>
+                {% else %}
+                <p>⏳ <em>Pending signature</em></p>
+                <div class="signature-line">Brand Representative Signature</div>
+                {% endif %}
+                <p><strong>Name:</strong> {{contract.brand_contact_name}}</p>
+                <p><strong>Company:</strong> {{contract.brand_name}}</p>
+            </div>
+            
+            <div style="width: 45%;">
+                <h4>INFLUENCER</h4>
+                {% if contract.influencer_signature %}
+                <p><strong>✓ Signed digitally by:</strong> {{contract.influencer_signature.signer_name}}</p>
+                <p><strong>Date:</strong> {{contract.influencer_signature.signature_timestamp.strftime(signature_ts_format)}}</p>
+                {% else %}
+                <p>⏳ <em>Pending signature</em></p>
+                <div class="signature-line">Influencer Signature</div>
+                {% endif %}
+                <p><strong>Name:</strong> {{contract.influencer_name}}</p>
+                <p><strong>Email:</strong> {{contract.influencer_email}}</p>
+            </div>
+        </div>
+    </div>
+
+    <div class="contract-meta" style="margin-top: 40px;">
+        <p><strong>⚖️ Legal Notice:</strong> This is a legally binding agreement. Both parties acknowledge they have read, understood, and agree to be bound by these terms.</p>
+        <p><strong>📄 Document Version:</strong> {{contract.contract_version}} | <strong>Generated:</strong> {{contract_date_formatted}}</p>
+    </div>
+</body>
+</html>
+"""
+
+_CONTRACT_TEMPLATE_NAME = "contract.html"
+_CONTRACT_CSS_NAME = "contract.css"
+
+# Number of rendered contract HTML documents kept per service instance
+RENDERED_HTML_CACHE_SIZE = 256
+
+# Contracts kept in memory when a durable store is configured; older ones are reloaded on demand
+CONTRACT_CACHE_SIZE = 1024
+
+# Most recently written contracts listed and indexed by session when a durable store is configured
+CONTRACT_INDEX_SIZE = 10000
+
+# Directory mtimes younger than this may still change within the same timestamp tick, so they never skip a rescan
+_RACY_MTIME_NS = 1_000_000_000
+
+# Contract ids are hex tokens (older ones are dashed UUIDs); anything else never touches the store
+_CONTRACT_ID_RE = re.compile(r"[0-9a-fA-F-]{1,64}")
+
+# Display format for digital signature timestamps
+_SIGNATURE_TS_FORMAT = '%B %d, %Y at %I:%M %p UTC'
+
+# Separates contracts inside a combined multi-contract PDF
+_PAGE_BREAK_HTML = '<div style="page-break-after: always;"></div>'
+
+# Read-only lookup tables, built once at import instead of on every helper call
+_CURRENCY_SYMBOLS = MappingProxyType({
+    'USD': '$', 'EUR': '€', 'GBP': '£', 'JPY': '¥',
+    'CAD': 'C$', 'AUD': 'A$', 'CHF': 'CHF ', 'CNY': '¥',
+    'INR': '₹', 'BRL': 'R$', 'MXN': 'MX$', 'KRW': '₩'
+})
+
+# Approximate exchange rates
+_RATES_FROM_USD = MappingProxyType({
+    'EUR': 0.85, 'GBP': 0.79, 'CAD': 1.35, 'AUD': 1.52,
+    'JPY': 150.0, 'INR': 83.0, 'BRL': 5.0, 'MXN': 18.0,
+    'CHF': 0.91, 'CNY': 7.2, 'KRW': 1320.0
+})
+
+# Governing law keyed by brand LocationType value
+_LAW_MAPPING = MappingProxyType({
+    "US": "State of Delaware, United States",
+    "UK": "England and Wales",
+    "Canada": "Province of Ontario, Canada", 
+    "Australia": "State of New South Wales, Australia",
+    "India": "Laws of India",
+    "Germany": "Laws of Germany",
+    "France": "Laws of France",
+    "Brazil": "Laws of Brazil",
+    "Japan": "Laws of Japan"
+})
+
+_DEFAULT_GOVERNING_LAW = "Laws of Delaware, United States"
+
+_LOCATION_CONTEXTS = MappingProxyType({
+    LocationType.INDIA: MappingProxyType({
+        "payment_methods": "Bank transfer, UPI, or digital wallet",
+        "tax_info": "GST applicable as per Indian tax laws",
+        "currency": "INR"
+    }),
+    LocationType.US: MappingProxyType({
+        "payment_methods": "ACH transfer or wire transfer", 
+        "tax_info": "1099-NEC will be issued for payments over $600",
+        "currency": "USD"
+    }),
+    LocationType.UK: MappingProxyType({
+        "payment_methods": "BACS or faster payments",
+        "tax_info": "Subject to UK tax regulations",
+        "currency": "GBP"
+    })
+})
+
+_DEFAULT_LOCATION_CONTEXT = MappingProxyType({
+    "payment_methods": "International wire transfer",
+    "tax_info": "Subject to local tax regulations", 
+    "currency": "USD"
+})
+
+
+# Currencies displayed without minor units
+_ZERO_DECIMAL_CURRENCIES = {'JPY', 'KRW'}
+
+
+def _make_currency_formatter(currency: str, symbol: str):
+    """Build a bound str.format that renders an amount with the currency's symbol and precision"""
+    spec = "{:,.0f}" if currency in _ZERO_DECIMAL_CURRENCIES else "{:,.2f}"
+    return (symbol + spec).format
+
+
+_CURRENCY_FORMATTERS = {
+    currency: _make_currency_formatter(currency, symbol)
+    for currency, symbol in _CURRENCY_SYMBOLS.items()
+}
+
+
+# Deliverables in one contract mostly repeat the same (amount, currency) pairs
+@functools.lru_cache(maxsize=1024)
+def _format_currency(amount: float, currency: str) -> str:
+    """Simple currency formatting."""
+    formatter = _CURRENCY_FORMATTERS.get(currency)
+    if formatter is None:
+        # Unknown currencies fall back to their code as the symbol
+        formatter = _make_currency_formatter(currency, f'{currency} ')
+    return formatter(amount)
+
+
+# Slug tables for placeholder contact emails
+_BRAND_SLUG_TABLE = str.maketrans({' ': None})
+_INFLUENCER_SLUG_TABLE = str.maketrans({' ': '.'})
+
+
+def _fallback_brand_email(brand_name: str) -> str:
+    """Placeholder legal contact email derived from the brand name"""
+    return f"legal@{brand_name.lower().translate(_BRAND_SLUG_TABLE)}.com"
+
+
+def _fallback_influencer_email(influencer_name: str) -> str:
+    """Placeholder email derived from the influencer name"""
+    return f"{influencer_name.lower().translate(_INFLUENCER_SLUG_TABLE)}@email.com"
+
+
+@functools.lru_cache(maxsize=1024)
+def _convert_from_usd(amount: float, to_currency: str) -> float:
+    """Simple fallback currency conversion from USD."""
+    if to_currency == 'USD':
+        return amount
+    
+    rate = _RATES_FROM_USD.get(to_currency, 1.0)
+    return amount * rate
+
+
+def _get_bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    """Persist compiled templates on disk so worker restarts skip the Jinja compile step"""
+    cache_dir = os.getenv("JINJA_CACHE_DIR")
+    if not cache_dir:
+        # Jinja's default is a per-user 0700 temp directory whose ownership it verifies,
+        # so other local users cannot plant bytecode for this process to load
+        try:
+            return FileSystemBytecodeCache()
+        except (OSError, RuntimeError) as e:
+            logger.warning(f"Jinja bytecode cache disabled, no safe default directory: {e}")
+            return None
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+    except OSError as e:
+        logger.warning(f"Jinja bytecode cache disabled, cannot create {cache_dir}: {e}")
+        return None
+    return FileSystemBytecodeCache(cache_dir)
+
+
+# Single Jinja environment so the contract template is compiled once per process
+_ENV = Environment(
+    loader=DictLoader({
+        _CONTRACT_TEMPLATE_NAME: _CONTRACT_TEMPLATE_STR,
+        _CONTRACT_CSS_NAME: CONTRACT_CSS_STR
+    }),
+    bytecode_cache=_get_bytecode_cache(),
+    autoescape=True,
+    trim_blocks=True,
+    lstrip_blocks=True
+)
+
+# WeasyPrint layout is CPU-bound, so async callers render in worker processes.
+# Capped because every API worker process gets its own pool.
+PDF_POOL_MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+_PDF_POOL: Optional[ProcessPoolExecutor] = None
+_PDF_POOL_LOCK = threading.Lock()
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """Create the PDF worker pool on first use"""
+    global _PDF_POOL
+    with _PDF_POOL_LOCK:
+        if _PDF_POOL is None:
+            # Spawned, not forked: the API process is multithreaded (event loop plus to_thread workers)
+            _PDF_POOL = ProcessPoolExecutor(
+                max_workers=PDF_POOL_MAX_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _PDF_POOL
+
+
+def shutdown_pdf_pool() -> None:
+    """Stop the PDF worker processes, if any were started (called on application shutdown)"""
+    global _PDF_POOL
+    with _PDF_POOL_LOCK:
+        pool, _PDF_POOL = _PDF_POOL, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def _signature_to_dict(signature: Optional[DigitalSignature]) -> Optional[Dict[str, Any]]:
+    if signature is None:
+        return None
+    data = asdict(signature)
+    data["signature_timestamp"] = signature.signature_timestamp.isoformat()
+    return data
+
+
+def _signature_from_dict(data: Optional[Dict[str, Any]]) -> Optional[DigitalSignature]:
+    if data is None:
+        return None
+    return DigitalSignature(**{**data, "signature_timestamp": datetime.fromisoformat(data["signature_timestamp"])})
+
+
+def _contract_to_dict(contract: ContractTerms) -> Dict[str, Any]:
+    """JSON-safe form of a contract for the durable store"""
+    data = asdict(contract)
+    data["deliverables"] = None if contract.deliverables is None else [
+        {**asdict(d), "platform": d.platform.value, "content_type": d.content_type.value}
+        for d in contract.deliverables
+    ]
+    for name in ("campaign_start_date", "campaign_end_date", "contract_date"):
+        data[name] = getattr(contract, name).isoformat()
+    data["status"] = contract.status.value
+    data["brand_signature"] = _signature_to_dict(contract.brand_signature)
+    data["influencer_signature"] = _signature_to_dict(contract.influencer_signature)
+    return data
+
+
+def _contract_from_dict(data: Dict[str, Any]) -> ContractTerms:
+    """Rebuild a contract stored by _contract_to_dict"""
+    deliverables = data["deliverables"]
+    return ContractTerms(**{
+        **data,
+        "deliverables": None if deliverables is None else [
+            ContentDeliverable(**{**d, "platform": PlatformType(d["platform"]), "content_type": ContentType(d["content_type"])})
+            for d in deliverables
+        ],
+        "campaign_start_date": datetime.fromisoformat(data["campaign_start_date"]),
+        "campaign_end_date": datetime.fromisoformat(data["campaign_end_date"]),
+        "contract_date": datetime.fromisoformat(data["contract_date"]),
+        "status": ContractStatus(data["status"]),
+        "brand_signature": _signature_from_dict(data["brand_signature"]),
+        "influencer_signature": _signature_from_dict(data["influencer_signature"]),
+    })
+
+
+class _ContractFileStore:
+    """Write-through store keeping one JSON-encoded ContractTerms per file under CONTRACT_STORE_DIR"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, contract_id: str) -> Optional[str]:
+        if not _CONTRACT_ID_RE.fullmatch(contract_id):
+            return None
+        return os.path.join(self.directory, f"{contract_id}.json")
+
+    def load(self, contract_id: str) -> Optional[ContractTerms]:
+        """Read a contract back from disk, or None if it was never stored"""
+        path = self._path(contract_id)
+        if path is None:
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return _contract_from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Failed to load stored contract {contract_id}: {e}")
+            return None
+
+    def save(self, contract: ContractTerms) -> Tuple[int, int]:
+        """Persist a contract atomically so readers never see a partial file; returns the file's version"""
+        path = self._path(contract.contract_id)
+        if path is None:
+            raise ValueError(f"Invalid contract id {contract.contract_id}")
+        # A unique temp file per write, so concurrent saves of one contract never share a partial file
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=self.directory,
+            prefix=f".{contract.contract_id}.", suffix=".tmp", delete=False
+        ) as f:
+            tmp_path = f.name
+            try:
+                json.dump(_contract_to_dict(contract), f)
+            except BaseException:
+                f.close()
+                os.unlink(tmp_path)
+                raise
+        os.replace(tmp_path, path)
+        return _file_version(os.stat(path))
+
+    def version(self, contract_id: str) -> Optional[Tuple[int, int]]:
+        """Current version of a stored contract, or None if it is not on disk"""
+        path = self._path(contract_id)
+        if path is None:
+            return None
+        try:
+            return _file_version(os.stat(path))
+        except FileNotFoundError:
+            return None
+
+    def directory_mtime(self) -> int:
+        """mtime_ns of the store directory, which moves whenever a contract is written"""
+        return os.stat(self.directory).st_mtime_ns
+
+    def scan(self) -> Dict[str, Tuple[int, int]]:
+        """contract_id → version of every stored contract, without reading the files"""
+        with os.scandir(self.directory) as entries:
+            return {
+                entry.name[:-len(".json")]: _file_version(entry.stat())
+                for entry in entries
+                if entry.name.endswith(".json") and _CONTRACT_ID_RE.fullmatch(entry.name[:-len(".json")])
+            }
+
+
+def _file_version(st: os.stat_result) -> Tuple[int, int]:
+    """(inode, mtime_ns) of a stored file; every save replaces the inode, so same-tick rewrites still differ"""
+    return (st.st_ino, st.st_mtime_ns)
+
+
+def _get_contract_store() -> Optional[_ContractFileStore]:
+    """Durable contract store, enabled by setting CONTRACT_STORE_DIR"""
+    store_dir = os.getenv("CONTRACT_STORE_DIR")
+    if not store_dir:
+        return None
+    try:
+        os.makedirs(store_dir, mode=0o700, exist_ok=True)
+    except OSError as e:
+        logger.warning(f"Contract store disabled, cannot create {store_dir}: {e}")
+        return None
+    return _ContractFileStore(store_dir)
+
 @dataclass
 class ContractDeliverable:
     content_type: str
@@ -43,14 +524,35 @@ class Contract:
     created_at: datetime
     status: str = "draft"
 
+class ContractNotFoundError(LookupError):
+    """Raised when a contract ID is unknown, so callers can tell it apart from rendering failures"""
+
+
 class ContractGenerationService:
     """Service for generating and managing digital contracts"""
     
+    # Legal templates
+    contract_template = _ENV.get_template(_CONTRACT_TEMPLATE_NAME)
+    
     def __init__(self):
-        self.contracts: Dict[str, ContractTerms] = {}  # In-memory storage for MVP
-        
-        # Legal templates
-        self.contract_template = self._get_contract_template()
+        # contract_id → contract, least recently used first; bounded only when a durable store can reload evictions
+        self.contracts: "OrderedDict[str, ContractTerms]" = OrderedDict()
+        self._store = _get_contract_store()
+        # The indexes below are bounded to CONTRACT_INDEX_SIZE, least recently written first, when a store backs them
+        self._session_index: "OrderedDict[str, str]" = OrderedDict()  # session_id → contract_id
+        # contract_id → API summary, so listing never reloads contracts or churns the LRU
+        self._summaries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # contract_id → (inode, mtime_ns) of the stored file the cached copy and index entry were built from
+        self._indexed_versions: "OrderedDict[str, Tuple[int, int]]" = OrderedDict()
+        # Store directory mtime at the last full scan; None forces the next sync to rescan
+        self._synced_dir_mtime: Optional[int] = None
+        # (contract_id, styles embedded, brand signed at, influencer signed at) → rendered HTML, least recently used first
+        self._rendered_html_cache: "OrderedDict[Tuple[str, bool, Optional[datetime], Optional[datetime]], str]" = OrderedDict()
+        # Guards the LRUs and indexes above; PDF exports touch them from worker threads.
+        # Re-entrant because signing and rendering look contracts up while holding it.
+        self._lock = threading.RLock()
+        if self._store is not None:
+            self._sync_index()
         
     def generate_contract(
         self, 
@@ -66,7 +568,7 @@ class ContractGenerationService:
         if not negotiation_state.agreed_terms:
             raise ValueError("No agreed terms found in negotiation state")
             
-        contract_id = str(uuid.uuid4())
+        contract_id = secrets.token_hex(16)
         agreed_terms = negotiation_state.agreed_terms
         brand = negotiation_state.brand_details
         influencer = negotiation_state.influencer_profile
@@ -75,9 +577,12 @@ class ContractGenerationService:
         location_context = self._get_location_context(brand.brand_location)
         currency = location_context["currency"]
         
-        # Calculate campaign dates
-        campaign_start = datetime.now() + timedelta(days=7)  # Start in 1 week
-        campaign_end = campaign_start + timedelta(days=agreed_terms.campaign_duration_days)
+        # Calculate campaign dates from a single timestamp, also used as the contract date
+        now = datetime.now()
+        campaign_start = now + timedelta(days=7)  # Start in 1 week
+        # Handler-built offers only carry timeline_days
+        duration_days = agreed_terms.campaign_duration_days or agreed_terms.timeline_days
+        campaign_end = campaign_start + timedelta(days=duration_days)
         
         # Determine governing law based on brand location
         governing_law = self._get_governing_law(brand.brand_location)
@@ -86,15 +591,15 @@ class ContractGenerationService:
             contract_id=contract_id,
             session_id=session_id,
             brand_name=brand.name,
-            brand_contact_email=brand_contact_email or f"legal@{brand.name.lower().replace(' ', '')}.com",
+            brand_contact_email=brand_contact_email or _fallback_brand_email(brand.name),
             brand_contact_name=brand_contact_name or f"{brand.name} Legal Team",
             influencer_name=influencer.name,
-            influencer_email=influencer_email or f"{influencer.name.lower().replace(' ', '.')}@email.com",
+            influencer_email=influencer_email or _fallback_influencer_email(influencer.name),
             influencer_contact=influencer_contact or "+1-XXX-XXX-XXXX",
             
             # Campaign Details
             campaign_title=f"{brand.name} x {influencer.name} Collaboration",
-            campaign_description=f"Influencer marketing campaign for {brand.name} across {', '.join([p.value for p in brand.target_platforms])}",
+            campaign_description=f"Influencer marketing campaign for {brand.name} across {brand.target_platforms_str}",
             deliverables=agreed_terms.deliverables,
             total_amount=agreed_terms.total_price,
             currency=currency,
@@ -104,33 +609,110 @@ class ContractGenerationService:
             
             # Legal Terms
             usage_rights=agreed_terms.usage_rights,
-            exclusivity_period_days=getattr(agreed_terms, 'exclusivity_period_days', None),
+            exclusivity_period_days=agreed_terms.exclusivity_period_days,
             revisions_included=agreed_terms.revisions_included,
             cancellation_policy=self._get_cancellation_policy(),
             dispute_resolution=self._get_dispute_resolution(),
             governing_law=governing_law,
             
             # Contract Metadata
-            contract_date=datetime.now(),
+            contract_date=now,
             status=ContractStatus.PENDING_SIGNATURES
         )
         
+        # Rates are static, so the displayed total is computed once here for every summary and render
+        contract_terms.total_amount_formatted = self._format_currency(
+            self._convert_from_usd(contract_terms.total_amount, currency), currency
+        )
+        
         # Store contract
-        self.contracts[contract_id] = contract_terms
+        self._save_contract(contract_terms)
         
         logger.info(f"Generated contract {contract_id} for session {session_id}")
         return contract_terms
     
     def get_contract(self, contract_id: str) -> Optional[ContractTerms]:
-        """Retrieve contract by ID"""
-        return self.contracts.get(contract_id)
+        """Retrieve contract by ID, reloading the cached copy if another worker has rewritten it"""
+        with self._lock:
+            contract = self.contracts.get(contract_id)
+            if self._store is None:
+                if contract is not None:
+                    self.contracts.move_to_end(contract_id)
+                return contract
+            
+            version = self._store.version(contract_id)
+            if version is None:
+                return contract
+            if contract is not None and self._indexed_versions.get(contract_id) == version:
+                self.contracts.move_to_end(contract_id)
+                return contract
+            
+            contract = self._store.load(contract_id)
+            if contract is not None:
+                self._cache_contract(contract)
+                self._index_contract(contract, version)
+            return contract
     
     def get_contract_by_session(self, session_id: str) -> Optional[ContractTerms]:
         """Retrieve contract by session ID"""
-        for contract in self.contracts.values():
-            if contract.session_id == session_id:
-                return contract
-        return None
+        with self._lock:
+            contract_id = self._session_index.get(session_id)
+            if contract_id is None and self._store is not None:
+                # Another worker may have generated it since the index was last synced
+                self._sync_index()
+                contract_id = self._session_index.get(session_id)
+        return self.get_contract(contract_id) if contract_id else None
+    
+    def _cache_contract(self, contract: ContractTerms) -> None:
+        """Insert into the in-memory LRU, evicting the oldest entry once a store backs it"""
+        self.contracts[contract.contract_id] = contract
+        self.contracts.move_to_end(contract.contract_id)
+        if self._store is not None and len(self.contracts) > CONTRACT_CACHE_SIZE:
+            self.contracts.popitem(last=False)
+    
+    def _save_contract(self, contract: ContractTerms) -> None:
+        """Write a new or updated contract through to memory and the durable store"""
+        with self._lock:
+            self._cache_contract(contract)
+            version = self._store.save(contract) if self._store is not None else None
+            self._index_contract(contract, version)
+    
+    def _index_contract(self, contract: ContractTerms, version: Optional[Tuple[int, int]] = None) -> None:
+        """Record a contract's session, listing summary and stored version as the most recently written"""
+        contract_id = contract.contract_id
+        self._session_index[contract.session_id] = contract_id
+        self._session_index.move_to_end(contract.session_id)
+        self._summaries[contract_id] = self._summary_from_contract(contract)
+        self._summaries.move_to_end(contract_id)
+        if version is not None:
+            self._indexed_versions[contract_id] = version
+            self._indexed_versions.move_to_end(contract_id)
+        if self._store is not None:
+            for index in (self._session_index, self._summaries, self._indexed_versions):
+                while len(index) > CONTRACT_INDEX_SIZE:
+                    index.popitem(last=False)
+    
+    def _sync_index(self) -> None:
+        """Pick up stored contracts written since the last sync (by this or another worker), reading only changed files"""
+        with self._lock:
+            # Read before scanning, so writes landing mid-scan move it again and trigger the next rescan
+            dir_mtime = self._store.directory_mtime()
+            if dir_mtime == self._synced_dir_mtime:
+                return
+            self._synced_dir_mtime = dir_mtime if time.time_ns() - dir_mtime > _RACY_MTIME_NS else None
+            
+            # Only the newest CONTRACT_INDEX_SIZE files are indexed, so evicted ones are not reloaded on every rescan
+            versions = sorted(self._store.scan().items(), key=lambda item: item[1][1])[-CONTRACT_INDEX_SIZE:]
+            for contract_id, version in versions:
+                if self._indexed_versions.get(contract_id) == version:
+                    continue
+                contract = self._store.load(contract_id)
+                if contract is None:
+                    continue
+                self._index_contract(contract, version)
+                # Refresh a cached copy in place without promoting it in the LRU
+                if contract_id in self.contracts:
+                    self.contracts[contract_id] = contract
     
     def sign_contract(
         self, 
@@ -143,141 +725,196 @@ class ContractGenerationService:
     ) -> ContractTerms:
         """Add digital signature to contract"""
         
-        contract = self.contracts.get(contract_id)
-        if not contract:
-            raise ValueError(f"Contract {contract_id} not found")
-        
-        signature = DigitalSignature(
-            signer_name=signer_name,
-            signer_email=signer_email,
-            signature_timestamp=datetime.now(),
-            ip_address=ip_address,
-            user_agent=user_agent
-        )
-        
-        if signer_type == "brand":
-            if contract.brand_signature:
-                raise ValueError("Brand has already signed this contract")
-            contract.brand_signature = signature
+        # Both parties may sign at once; the check-then-sign must not interleave
+        with self._lock:
+            contract = self.get_contract(contract_id)
+            if not contract:
+                raise ContractNotFoundError(f"Contract {contract_id} not found")
+        
+            signature = DigitalSignature(
+                signer_name=signer_name,
+                signer_email=signer_email,
+                signature_timestamp=datetime.now(),
+                ip_address=ip_address,
+                user_agent=user_agent
+            )
+        
+            if signer_type == "brand":
+                if contract.brand_signature:
+                    raise ValueError("Brand has already signed this contract")
+                contract.brand_signature = signature
             
-            # Update status
-            if contract.influencer_signature:
-                contract.status = ContractStatus.FULLY_EXECUTED
-            else:
-                contract.status = ContractStatus.BRAND_SIGNED
+                # Update status
+                if contract.influencer_signature:
+                    contract.status = ContractStatus.FULLY_EXECUTED
+                else:
+                    contract.status = ContractStatus.BRAND_SIGNED
                 
-        elif signer_type == "influencer":
-            if contract.influencer_signature:
-                raise ValueError("Influencer has already signed this contract")
-            contract.influencer_signature = signature
+            elif signer_type == "influencer":
+                if contract.influencer_signature:
+                    raise ValueError("Influencer has already signed this contract")
+                contract.influencer_signature = signature
             
-            # Update status
-            if contract.brand_signature:
-                contract.status = ContractStatus.FULLY_EXECUTED
+                # Update status
+                if contract.brand_signature:
+                    contract.status = ContractStatus.FULLY_EXECUTED
+                else:
+                    contract.status = ContractStatus.INFLUENCER_SIGNED
             else:
-                contract.status = ContractStatus.INFLUENCER_SIGNED
-        else:
-            raise ValueError("signer_type must be 'brand' or 'influencer'")
+                raise ValueError("signer_type must be 'brand' or 'influencer'")
+        
+            self._save_contract(contract)
         
         logger.info(f"Contract {contract_id} signed by {signer_type}: {signer_name}")
         return contract
     
-    def generate_contract_pdf_content(self, contract_id: str) -> str:
-        """Generate HTML content for contract that can be converted to PDF"""
+    def generate_contract_pdf_content(self, contract_id: str, embed_styles: bool = True) -> str:
+        """Generate HTML content for contract that can be converted to PDF (PDF paths pass embed_styles=False)"""
         
-        contract = self.contracts.get(contract_id)
+        contract = self.get_contract(contract_id)
         if not contract:
-            raise ValueError(f"Contract {contract_id} not found")
-        
-        # Prepare deliverables breakdown
-        deliverables_html = ""
-        for i, deliverable in enumerate(contract.deliverables, 1):
-            # Convert price to local currency for display
-            price_local = self._convert_from_usd(deliverable.proposed_price, contract.currency)
-            price_formatted = self._format_currency(price_local, contract.currency)
-            
-            deliverables_html += f"""
-            <tr>
-                <td>{i}</td>
-                <td>{deliverable.platform.value.title()}</td>
-                <td>{deliverable.content_type.value.replace('_', ' ').title()}</td>
-                <td>{deliverable.quantity}</td>
-                <td>{price_formatted}</td>
-            </tr>
-            """
-        
-        # Convert total amount to local currency
-        total_local = self._convert_from_usd(contract.total_amount, contract.currency)
-        total_formatted = self._format_currency(total_local, contract.currency)
-        
-        # Signature sections
-        brand_signature_html = ""
-        influencer_signature_html = ""
-        
-        if contract.brand_signature:
-            brand_signature_html = f"""
-            <p><strong>✓ Signed digitally by:</strong> {contract.brand_signature.signer_name}</p>
-            <p><strong>Date:</strong> {contract.brand_signature.signature_timestamp.strftime('%B %d, %Y at %I:%M %p UTC')}</p>
-            """
-        else:
-            brand_signature_html = """
-            <p>⏳ <em>Pending signature</em></p>
-            <div class="signature-line">Brand Representative Signature</div>
-            """
-        
-        if contract.influencer_signature:
-            influencer_signature_html = f"""
-            <p><strong>✓ Signed digitally by:</strong> {contract.influencer_signature.signer_name}</p>
-            <p><strong>Date:</strong> {contract.influencer_signature.signature_timestamp.strftime('%B %d, %Y at %I:%M %p UTC')}</p>
-            """
-        else:
-            influencer_signature_html = """
-            <p>⏳ <em>Pending signature</em></p>
-            <div class="signature-line">Influencer Signature</div>
-            """
+            raise ContractNotFoundError(f"Contract {contract_id} not found")
+        
+        # Contract content only changes when someone signs, so reuse the last render until then
+        cache_key = (
+            contract_id,
+            embed_styles,
+            contract.brand_signature and contract.brand_signature.signature_timestamp,
+            contract.influencer_signature and contract.influencer_signature.signature_timestamp
+        )
+        with self._lock:
+            cached_html = self._rendered_html_cache.get(cache_key)
+            if cached_html is not None:
+                self._rendered_html_cache.move_to_end(cache_key)
+                return cached_html
+        
+        # Prepare deliverables breakdown, prices converted to local currency for display
+        rows = [
+            (
+                i,
+                _PLATFORM_TITLE[deliverable.platform],
+                _CONTENT_TYPE_TITLE[deliverable.content_type],
+                deliverable.quantity,
+                self._format_currency(
+                    self._convert_from_usd(deliverable.proposed_price, contract.currency),
+                    contract.currency
+                )
+            )
+            for i, deliverable in enumerate(contract.deliverables or [], 1)
+        ]
+        
+        total_formatted = self._get_total_formatted(contract)
         
         template_data = {
             'contract': contract,
-            'deliverables_html': deliverables_html,
+            'rows': rows,
             'total_formatted': total_formatted,
-            'brand_signature_html': brand_signature_html,
-            'influencer_signature_html': influencer_signature_html,
+            'signature_ts_format': _SIGNATURE_TS_FORMAT,
+            'status_badge_class': self._get_status_badge_class(contract),
+            'embed_styles': embed_styles,
             'campaign_start_formatted': contract.campaign_start_date.strftime('%B %d, %Y'),
             'campaign_end_formatted': contract.campaign_end_date.strftime('%B %d, %Y'),
             'contract_date_formatted': contract.contract_date.strftime('%B %d, %Y')
         }
         
-        return self.contract_template.render(**template_data)
+        html_content = self.contract_template.render(**template_data)
+        
+        with self._lock:
+            self._rendered_html_cache[cache_key] = html_content
+            if len(self._rendered_html_cache) > RENDERED_HTML_CACHE_SIZE:
+                self._rendered_html_cache.popitem(last=False)
+        
+        return html_content
 
-    def generate_contract_pdf(self, contract_id: str) -> bytes:
-        """Generate PDF from contract HTML"""
+    def write_contract_pdf(self, contract_id: str, target: IO[bytes]) -> None:
+        """Write the contract PDF straight into a caller-supplied binary file object"""
         try:
             # Get HTML content
-            html_content = self.generate_contract_pdf_content(contract_id)
+            html_content = self.generate_contract_pdf_content(contract_id, embed_styles=False)
             
             # Convert to PDF
-            html_doc = HTML(string=html_content)
-            pdf_buffer = BytesIO()
-            html_doc.write_pdf(pdf_buffer)
-            pdf_buffer.seek(0)
+            write_pdf(html_content, target)
             
             logger.info(f"Successfully generated PDF for contract {contract_id}")
-            return pdf_buffer.getvalue()
             
+        except ContractNotFoundError:
+            raise
         except Exception as e:
             logger.error(f"Error generating PDF for contract {contract_id}: {e}")
-            raise ValueError(f"Failed to generate PDF: {str(e)}")
+            raise RuntimeError(f"Failed to generate PDF: {str(e)}") from e
+    
+    def generate_contract_pdf(self, contract_id: str) -> bytes:
+        """Generate PDF from contract HTML"""
+        pdf_buffer = BytesIO()
+        self.write_contract_pdf(contract_id, pdf_buffer)
+        return pdf_buffer.getvalue()
+    
+    async def generate_contract_pdf_async(self, contract_id: str) -> bytes:
+        """Generate PDF from contract HTML without blocking the event loop"""
+        try:
+            # Template rendering and contract loads block too, so they run on a thread rather than the event loop
+            html_content = await asyncio.to_thread(
+                self.generate_contract_pdf_content, contract_id, embed_styles=False
+            )
+            
+            loop = asyncio.get_running_loop()
+            pdf_bytes = await loop.run_in_executor(_get_pdf_pool(), render_pdf, html_content)
+            
+            logger.info(f"Successfully generated PDF for contract {contract_id}")
+            return pdf_bytes
+            
+        except ContractNotFoundError:
+            raise
+        except Exception as e:
+            logger.error(f"Error generating PDF for contract {contract_id}: {e}")
+            raise RuntimeError(f"Failed to generate PDF: {str(e)}") from e
+    
+    def write_contracts_pdf_bulk(self, contract_ids: List[str], target: IO[bytes]) -> None:
+        """Write one PDF covering several contracts with a single WeasyPrint layout pass"""
+        if not contract_ids:
+            raise ValueError("No contract IDs provided")
+        
+        try:
+            head = ""
+            bodies = []
+            for contract_id in contract_ids:
+                html_content = self.generate_contract_pdf_content(contract_id, embed_styles=False)
+                body_start = html_content.index("<body>") + len("<body>")
+                body_end = html_content.rindex("</body>")
+                # Every contract shares the same <head>, so keep only the first
+                head = head or html_content[:body_start]
+                bodies.append(html_content[body_start:body_end])
+            
+            combined_html = head + _PAGE_BREAK_HTML.join(bodies) + "</body>\n</html>\n"
+            
+            write_pdf(combined_html, target)
+            
+            logger.info(f"Successfully generated bulk PDF for {len(contract_ids)} contracts")
+            
+        except ContractNotFoundError:
+            raise
+        except Exception as e:
+            logger.error(f"Error generating bulk PDF for contracts {contract_ids}: {e}")
+            raise RuntimeError(f"Failed to generate PDF: {str(e)}") from e
+    
+    def generate_contracts_pdf_bulk(self, contract_ids: List[str]) -> bytes:
+        """Generate one PDF covering several contracts"""
+        pdf_buffer = BytesIO()
+        self.write_contracts_pdf_bulk(contract_ids, pdf_buffer)
+        return pdf_buffer.getvalue()
     
     def get_contract_summary(self, contract_id: str) -> Dict[str, Any]:
         """Get contract summary for API responses"""
         
-        contract = self.contracts.get(contract_id)
+        contract = self.get_contract(contract_id)
         if not contract:
             return {"error": f"Contract {contract_id} not found"}
         
-        # Convert amount to local currency
-        total_local = self._convert_from_usd(contract.total_amount, contract.currency)
-        total_formatted = self._format_currency(total_local, contract.currency)
+        return self._summary_from_contract(contract)
+    
+    def _summary_from_contract(self, contract: ContractTerms) -> Dict[str, Any]:
+        """Build the API summary for an already-loaded contract"""
+        total_formatted = self._get_total_formatted(contract)
         
         return {
             "contract_id": contract.contract_id,
@@ -286,7 +923,7 @@ class ContractGenerationService:
             "influencer_name": contract.influencer_name,
             "campaign_title": contract.campaign_title,
             "total_amount": total_formatted,
-            "deliverables_count": len(contract.deliverables),
+            "deliverables_count": len(contract.deliverables or []),
             "campaign_start": contract.campaign_start_date.isoformat(),
             "campaign_end": contract.campaign_end_date.isoformat(),
             "signatures": {
@@ -299,25 +936,16 @@ class ContractGenerationService:
     
     def list_contracts(self) -> List[Dict[str, Any]]:
         """List all contracts with summaries"""
-        return [self.get_contract_summary(contract_id) for contract_id in self.contracts.keys()]
+        with self._lock:
+            if self._store is not None:
+                self._sync_index()
+            return list(self._summaries.values())
     
     def _get_governing_law(self, brand_location) -> str:
         """Determine governing law based on brand location"""
-        law_mapping = {
-            "US": "State of Delaware, United States",
-            "UK": "England and Wales",
-            "Canada": "Province of Ontario, Canada", 
-            "Australia": "State of New South Wales, Australia",
-            "India": "Laws of India",
-            "Germany": "Laws of Germany",
-            "France": "Laws of France",
-            "Brazil": "Laws of Brazil",
-            "Japan": "Laws of Japan"
-        }
-        
-        if brand_location and brand_location.value in law_mapping:
-            return law_mapping[brand_location.value]
-        return "Laws of Delaware, United States"  # Default
+        if brand_location and brand_location.value in _LAW_MAPPING:
+            return _LAW_MAPPING[brand_location.value]
+        return _DEFAULT_GOVERNING_LAW
     
     def _get_cancellation_policy(self) -> str:
         """Standard cancellation policy"""
@@ -334,205 +962,32 @@ class ContractGenerationService:
         3. Binding arbitration as final resort
         Both parties waive right to jury trial for disputes under this agreement."""
     
-    def _get_contract_template(self) -> Template:
-        """HTML template for contract generation"""
-        template_str = """
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <title>Influencer Marketing Agreement - {{contract.contract_id}}</title>
-    <style>
-        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 800px; margin: 0 auto; padding: 20px; }
-        .header { text-align: center; border-bottom: 2px solid #333; padding-bottom: 20px; margin-bottom: 30px; }
-        .section { margin: 20px 0; }
-        .section-title { font-size: 18px; font-weight: bold; color: #2c3e50; margin-bottom: 10px; border-bottom: 1px solid #eee; padding-bottom: 5px; }
-        .deliverables-table { width: 100%; border-collapse: collapse; margin: 15px 0; }
-        .deliverables-table th, .deliverables-table td { border: 1px solid #ddd; padding: 8px; text-align: left; }
-        .deliverables-table th { background-color: #f2f2f2; font-weight: bold; }
-        .signature-section { margin-top: 40px; }
-        .signature-line { border-bottom: 1px solid #333; width: 300px; height: 30px; margin: 10px 0; }
-        .contract-meta { background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin: 20px 0; }
-        .status-badge { display: inline-block; padding: 5px 10px; border-radius: 15px; color: white; font-size: 12px; }
-        .status-pending { background-color: #ffc107; }
-        .status-signed { background-color: #28a745; }
-        .status-executed { background-color: #007bff; }
-        .highlight { background-color: #fff3cd; padding: 10px; border-left: 4px solid #ffc107; margin: 10px 0; }
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>INFLUENCER MARKETING AGREEMENT</h1>
-        <p><strong>Contract ID:</strong> {{contract.contract_id}}</p>
-        <p><strong>Date:</strong> {{contract_date_formatted}}</p>
-        <span class="status-badge 
-            {% if contract.status == 'fully_executed' %}status-executed
-            {% elif contract.brand_signature and contract.influencer_signature %}status-signed
-            {% else %}status-pending{% endif %}">
-            {{contract.status.value.replace('_', ' ').title()}}
-        </span>
-    </div>
-
-    <div class="contract-meta">
-        <h3>📋 Agreement Overview</h3>
-        <p><strong>Campaign:</strong> {{contract.campaign_title}}</p>
-        <p><strong>Total Investment:</strong> {{total_formatted}}</p>
-        <p><strong>Campaign Period:</strong> {{campaign_start_formatted}} to {{campaign_end_formatted}}</p>
-    </div>
-
-    <div class="section">
-        <div class="section-title">1. PARTIES</div>
-        <p><strong>Brand ("Client"):</strong><br>
-        {{contract.brand_name}}<br>
-        Contact: {{contract.brand_contact_name}}<br>
-        Email: {{contract.brand_contact_email}}</p>
-        
-        <p><strong>Influencer ("Creator"):</strong><br>
-        {{contract.influencer_name}}<br>
-        Email: {{contract.influencer_email}}<br>
-        Contact: {{contract.influencer_contact}}</p>
-    </div>
-
-    <div class="section">
-        <div class="section-title">2. CAMPAIGN DETAILS</div>
-        <p><strong>Campaign Description:</strong> {{contract.campaign_description}}</p>
-        <p><strong>Campaign Duration:</strong> {{campaign_start_formatted}} to {{campaign_end_formatted}}</p>
-    </div>
-
-    <div class="section">
-        <div class="section-title">3. DELIVERABLES & COMPENSATION</div>
-        <table class="deliverables-table">
-            <thead>
-                <tr>
-                    <th>#</th>
-                    <th>Platform</th>
-                    <th>Content Type</th>
-                    <th>Quantity</th>
-                    <th>Amount</th>
-                </tr>
-            </thead>
-            <tbody>
-                {{deliverables_html|safe}}
-            </tbody>
-            <tfoot>
-                <tr style="font-weight: bold; background-color: #f8f9fa;">
-                    <td colspan="4">TOTAL COMPENSATION</td>
-                    <td>{{total_formatted}}</td>
-                </tr>
-            </tfoot>
-        </table>
-    </div>
-
-    <div class="section">
-        <div class="section-title">4. PAYMENT TERMS</div>
-        <p>{{contract.payment_terms}}</p>
-        <p><strong>Currency:</strong> {{contract.currency}}</p>
-    </div>
-
-    <div class="section">
-        <div class="section-title">5. CONTENT REQUIREMENTS</div>
-        <p><strong>Revisions Included:</strong> {{contract.revisions_included}} rounds of revisions</p>
-        <p><strong>Usage Rights:</strong> {{contract.usage_rights}}</p>
-        {% if contract.exclusivity_period_days %}
-        <p><strong>Exclusivity Period:</strong> {{contract.exclusivity_period_days}} days</p>
-        {% endif %}
-    </div>
-
-    <div class="section">
-        <div class="section-title">6. LEGAL TERMS</div>
-        <p><strong>Cancellation Policy:</strong></p>
-        <div class="highlight">{{contract.cancellation_policy}}</div>
-        
-        <p><strong>Dispute Resolution:</strong></p>
-        <div class="highlight">{{contract.dispute_resolution}}</div>
-        
-        <p><strong>Governing Law:</strong> {{contract.governing_law}}</p>
-    </div>
-
-    <div class="signature-section">
-        <div class="section-title">7. SIGNATURES</div>
-        
-        <div style="display: flex; justify-content: space-between; margin-top: 30px;">
-            <div style="width: 45%;">
-                <h4>BRAND REPRESENTATIVE</h4>
-                {{brand_signature_html|safe}}
-                <p><strong>Name:</strong> {{contract.brand_contact_name}}</p>
-                <p><strong>Company:</strong> {{contract.brand_name}}</p>
-            </div>
-            
-            <div style="width: 45%;">
-                <h4>INFLUENCER</h4>
-                {{influencer_signature_html|safe}}
-                <p><strong>Name:</strong> {{contract.influencer_name}}</p>
-                <p><strong>Email:</strong> {{contract.influencer_email}}</p>
-            </div>
-        </div>
-    </div>
-
-    <div class="contract-meta" style="margin-top: 40px;">
-        <p><strong>⚖️ Legal Notice:</strong> This is a legally binding agreement. Both parties acknowledge they have read, understood, and agree to be bound by these terms.</p>
-        <p><strong>📄 Document Version:</strong> {{contract.contract_version}} | <strong>Generated:</strong> {{contract_date_formatted}}</p>
-    </div>
-</body>
-</html>
-        """
-        return Template(template_str)
-
     def _format_currency(self, amount: float, currency: str) -> str:
         """Simple currency formatting."""
-        currency_symbols = {
-            'USD': '$', 'EUR': '€', 'GBP': '£', 'JPY': '¥',
-            'CAD': 'C$', 'AUD': 'A$', 'CHF': 'CHF ', 'CNY': '¥',
-            'INR': '₹', 'BRL': 'R$', 'MXN': 'MX$', 'KRW': '₩'
-        }
-        
-        symbol = currency_symbols.get(currency, f'{currency} ')
-        
-        if currency in ['JPY', 'KRW']:
-            return f"{symbol}{amount:,.0f}"
-        else:
-            return f"{symbol}{amount:,.2f}"
+        return _format_currency(amount, currency)
 
     def _convert_from_usd(self, amount: float, to_currency: str) -> float:
         """Simple fallback currency conversion from USD."""
-        if to_currency == 'USD':
-            return amount
-        
-        # Approximate exchange rates
-        rates_from_usd = {
-            'EUR': 0.85, 'GBP': 0.79, 'CAD': 1.35, 'AUD': 1.52,
-            'JPY': 150.0, 'INR': 83.0, 'BRL': 5.0, 'MXN': 18.0,
-            'CHF': 0.91, 'CNY': 7.2, 'KRW': 1320.0
-        }
-        
-        rate = rates_from_usd.get(to_currency, 1.0)
-        return amount * rate
+        return _convert_from_usd(amount, to_currency)
+
+    def _get_status_badge_class(self, contract: ContractTerms) -> str:
+        """CSS class for the contract status badge"""
+        if contract.status == ContractStatus.FULLY_EXECUTED:
+            return 'status-executed'
+        if contract.brand_signature and contract.influencer_signature:
+            return 'status-signed'
+        return 'status-pending'
+
+    def _get_total_formatted(self, contract: ContractTerms) -> str:
+        """Contract total in local currency, using the value cached at generation when present"""
+        if contract.total_amount_formatted is None:
+            total_local = self._convert_from_usd(contract.total_amount, contract.currency)
+            contract.total_amount_formatted = self._format_currency(total_local, contract.currency)
+        return contract.total_amount_formatted
 
-    def _get_location_context(self, location: LocationType) -> Dict[str, str]:
+    def _get_location_context(self, location: LocationType) -> Mapping[str, str]:
         """Get basic location context."""
-        location_contexts = {
-            LocationType.INDIA: {
-                "payment_methods": "Bank transfer, UPI, or digital wallet",
-                "tax_info": "GST applicable as per Indian tax laws",
-                "currency": "INR"
-            },
-            LocationType.US: {
-                "payment_methods": "ACH transfer or wire transfer", 
-                "tax_info": "1099-NEC will be issued for payments over $600",
-                "currency": "USD"
-            },
-            LocationType.UK: {
-                "payment_methods": "BACS or faster payments",
-                "tax_info": "Subject to UK tax regulations",
-                "currency": "GBP"
-            }
-        }
-        
-        return location_contexts.get(location, {
-            "payment_methods": "International wire transfer",
-            "tax_info": "Subject to local tax regulations", 
-            "currency": "USD"
-        })
+        return _LOCATION_CONTEXTS.get(location, _DEFAULT_LOCATION_CONTEXT)
 
 # Global instance
 contract_service = ContractGenerationService()
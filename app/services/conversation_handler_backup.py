@@ -13,6 +13,9 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Currency symbols and thousands separators removed before parsing a formatted amount
+_CURRENCY_STRIP = str.maketrans('', '', '₹$€£¥,')
+
 # Import contract service lazily to avoid circular imports
 def get_contract_service():
     try:
@@ -224,14 +227,14 @@ Feel free to reach out if you'd like to discuss future collaboration opportuniti
             # Convert to display currency if needed
             if display_currency != "USD":
                 unit_rate_usd = self._convert_to_usd(
-                    float(details['rate_per_piece'].replace('₹', '').replace('$', '').replace(',', '')), 
+                    float(details['rate_per_piece'].translate(_CURRENCY_STRIP)), 
                     "USD"
                 )
                 unit_rate_display = self._convert_from_usd(unit_rate_usd, display_currency)
                 unit_rate_formatted = self._format_currency(unit_rate_display, display_currency)
                 
                 total_usd = self._convert_to_usd(
-                    float(details['total'].replace('₹', '').replace('$', '').replace(',', '')),
+                    float(details['total'].translate(_CURRENCY_STRIP)),
                     "USD"
                 )
                 total_display = self._convert_from_usd(total_usd, display_currency)
@@ -268,7 +271,7 @@ Feel free to reach out if you'd like to discuss future collaboration opportuniti
         total_offer_display = budget_proposal["total_budget"]
         if display_currency != "USD":
             total_usd = self._convert_to_usd(
-                float(budget_proposal["total_budget"].replace('₹', '').replace('$', '').replace(',', '')),
+                float(budget_proposal["total_budget"].translate(_CURRENCY_STRIP)),
                 "USD"
             )
             total_display_amount = self._convert_from_usd(total_usd, display_currency)
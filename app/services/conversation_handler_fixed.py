@@ -1,19 +1,136 @@
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Callable, Deque, Dict, List, Optional, Any, Tuple
 import json
-import uuid
+import functools
+import string
+import time
+import secrets
+import threading
+from collections import OrderedDict, deque
 import re
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from app.models.negotiation_models import (
     NegotiationState, BrandDetails, InfluencerProfile, 
     NegotiationOffer, ContentDeliverable, NegotiationStatus,
-    PlatformType, ContentType, LocationType
+    PlatformType, ContentType, LocationType, ContractStatus
 )
 import logging
 from enum import Enum
 
 logger = logging.getLogger(__name__)
 
+# Sessions kept in memory; the least recently used one is dropped beyond this
+MAX_ACTIVE_SESSIONS = 10_000
+
+# Sessions idle for longer than this are dropped on the next session creation or lookup
+SESSION_IDLE_TTL_SECONDS = 24 * 3600
+
+# Most recent conversation turns kept per session
+CONVERSATION_HISTORY_LIMIT = 200
+
+# Distinct brand-only messages (greeting, rejection) kept rendered
+RENDERED_MESSAGE_CACHE_SIZE = 1024
+
+# General replies are memoized only for inputs up to this length; long messages rarely repeat
+# and would keep large cache keys alive
+GENERAL_RESPONSE_CACHE_MAX_INPUT = 64
+
+# Per-session work is serialized on one of this many striped locks (must be a power of two)
+SESSION_LOCK_STRIPES = 64
+
+# First amount in a counter-offer; commas are stripped before matching, so no thousands group is needed
+_PRICE_RE = re.compile(r'[₹$€£¥]?(\d+(?:\.\d{2})?)')
+
+_CURRENCY_SYMBOLS = {
+    'USD': '$', 'EUR': '€', 'GBP': '£', 'JPY': '¥',
+    'CAD': 'C$', 'AUD': 'A$', 'CHF': 'CHF ', 'CNY': '¥',
+    'INR': '₹', 'BRL': 'R$', 'MXN': 'MX$', 'KRW': '₩'
+}
+
+# Approximate exchange rates
+_RATES_FROM_USD = {
+    'EUR': 0.85, 'GBP': 0.79, 'CAD': 1.35, 'AUD': 1.52,
+    'JPY': 150.0, 'INR': 83.0, 'BRL': 5.0, 'MXN': 18.0,
+    'CHF': 0.91, 'CNY': 7.2, 'KRW': 1320.0
+}
+
+_RATES_TO_USD = {
+    'EUR': 1.18, 'GBP': 1.27, 'CAD': 0.74, 'AUD': 0.66,
+    'JPY': 0.0067, 'INR': 0.012, 'BRL': 0.20, 'MXN': 0.055,
+    'CHF': 1.10, 'CNY': 0.14, 'KRW': 0.00076
+}
+
+# Display labels for contract statuses, built once
+_CONTRACT_STATUS_LABELS = {status: status.value.replace('_', ' ').title() for status in ContractStatus}
+
+# Location-specific wording, looked up per message instead of branching on the location
+_CULTURAL_NOTES = {
+    LocationType.INDIA: "\n\n🤝 **Partnership Approach**: We believe in building long-term relationships with talented creators like yourself. This budget allocation reflects our commitment to fair compensation while ensuring campaign success.",
+    LocationType.US: "\n\n📊 **Market Alignment**: Our budget allocation is competitive with current market standards and designed for optimal ROI.",
+    LocationType.BRAZIL: "\n\n🌟 **Collaboration Focus**: We're excited about the creative potential of this partnership and have allocated our budget to support your artistic vision.",
+}
+_PAYMENT_TERMS = {
+    LocationType.INDIA: "50% advance, 50% on completion (milestone-based as preferred in Indian market)",
+    LocationType.US: "50% upfront, 50% within NET-30 terms",
+}
+_DEFAULT_PAYMENT_TERMS = "50% advance, 50% on completion"
+
+# Appended to the agreement message when no digital contract could be generated
+_CONTRACT_PENDING_NOTE = "\n\n📄 **Contract Generation**: Our legal team will prepare the digital contract within 2 business days."
+
+# Counter-offers slightly over budget: location → (compromise price from (ours, counter, max allowable), suggestion)
+_FLEX_COMPROMISES = {
+    LocationType.INDIA: (
+        lambda ours, counter, max_allowable: (ours + counter) / 2,
+        "We appreciate your professional approach! Let's meet in the middle. How about {price}? This shows our commitment to building a long-term partnership."
+    ),
+    LocationType.US: (
+        lambda ours, counter, max_allowable: min(counter, max_allowable),
+        "Given your quality portfolio, we can stretch our budget slightly. Would {price} work for you?"
+    ),
+}
+_DEFAULT_FLEX_COMPROMISE = (
+    lambda ours, counter, max_allowable: (ours + min(counter, max_allowable)) / 2,
+    "We value this collaboration. Let's find a solution at {price}?"
+)
+
+# All intent keywords in one pattern; the named group of each match tells which intent it belongs to.
+# Whole words only ("I know" is not "no"), but with the inflections people actually type ("Agreed!", "declined").
+_INTENT_RE = re.compile(
+    r'(?P<accept>\b(?:accept(?:s|ed|ing)?|agree(?:s|d|ing)?|deal|yes|perfect|sounds\s+good)\b)'
+    r'|(?P<reject>\b(?:reject(?:s|ed|ing)?|declin(?:e|es|ed|ing)|no|not\s+interested|pass(?:ed|ing)?)\b)'
+    r'|(?P<counter>\b(?:counter(?:s|ed|ing)?|offer(?:s|ed|ing)?|suggest(?:s|ed|ing)?|pric(?:e|es|ed|ing)|rates?)\b|\$)'
+    r'|(?P<clarify>\b(?:questions?|clarif(?:y|ied|ying|ication)|explain(?:s|ed|ing)?|details|more\s+info)\b)',
+    re.IGNORECASE
+)
+
+# When a message matches several intents, the first of these wins
+_INTENT_PRIORITY = ('accept', 'reject', 'counter', 'clarify')
+
+# Sentiment cues for general replies, matched case-insensitively anywhere in the input
+_POSITIVE_SENTIMENT_RE = re.compile(r'excited|interested|love|great', re.IGNORECASE)
+_NEGATIVE_SENTIMENT_RE = re.compile(r'concerned|worried|unsure', re.IGNORECASE)
+
+# Fixed replies, built once rather than on every turn
+_CLARIFICATION_RESPONSE = """I'm happy to clarify any details! Here are some key points that might help:
+
+📋 **Content Deliverables**: Each piece includes concept development, creation, editing, and posting
+🔄 **Revision Process**: 2 rounds of revisions included to ensure content meets brand guidelines
+📅 **Timeline**: Flexible scheduling with milestone-based delivery
+💳 **Payment**: Secure payment processing with clear terms
+🎯 **Brand Guidelines**: Detailed brief provided to ensure authentic content creation
+📊 **Performance**: Optional performance reporting available
+
+What specific aspect would you like me to explain further?"""
+
+# General replies by sentiment: positive, negative, neutral (the fourth is currently unused)
+_GENERAL_RESPONSES = (
+    "That's a great point! I want to make sure we create a collaboration that truly works for you. What aspects are most important to you in this partnership?",
+    "I appreciate your perspective! Let's make sure we address all your concerns. What would make this opportunity more appealing for you?",
+    "Absolutely! Building the right partnership is crucial. What elements would you like to discuss or adjust in our proposal?",
+    "I'm here to make this as smooth as possible for you. What questions or suggestions do you have about the collaboration structure?"
+)
+
 # Import contract service lazily to avoid circular imports
 def get_contract_service():
     try:
@@ -23,14 +140,120 @@ def get_contract_service():
         logger.warning("Contract service not available")
         return None
 
+# Negotiation messages format and convert the same few (amount, currency) pairs over and over
+@functools.lru_cache(maxsize=4096)
+def _format_currency(amount: float, currency: str) -> str:
+    """Simple currency formatting."""
+    symbol = _CURRENCY_SYMBOLS.get(currency, f'{currency} ')
+    
+    if currency in ['JPY', 'KRW']:
+        return f"{symbol}{amount:,.0f}"
+    else:
+        return f"{symbol}{amount:,.2f}"
+
+def _rate_from_usd(to_currency: str) -> float:
+    """USD to to_currency multiplier (1.0 for USD and unknown currencies)"""
+    if to_currency == 'USD':
+        return 1.0
+    return _RATES_FROM_USD.get(to_currency, 1.0)
+
+@functools.lru_cache(maxsize=4096)
+def _convert_from_usd(amount: float, to_currency: str) -> float:
+    """Simple fallback currency conversion from USD."""
+    if to_currency == 'USD':
+        return amount
+    return amount * _rate_from_usd(to_currency)
+
+@functools.lru_cache(maxsize=4096)
+def _convert_to_usd(amount: float, from_currency: str) -> float:
+    """Simple fallback currency conversion to USD."""
+    if from_currency == 'USD':
+        return amount
+    return amount * _RATES_TO_USD.get(from_currency, 1.0)
+
+def _brand_currency(brand: BrandDetails) -> str:
+    """Currency the brand negotiates in, USD when none is specified"""
+    return getattr(brand, 'budget_currency', None) or "USD"
+
+def _classify_intent(user_input: str) -> Optional[str]:
+    """Highest-priority intent in the message, or None for a general reply"""
+    intents = {match.lastgroup for match in _INTENT_RE.finditer(user_input)}
+    return next((intent for intent in _INTENT_PRIORITY if intent in intents), None)
+
+def _select_general_response(user_input: str) -> str:
+    """Simple sentiment-based response selection"""
+    if _POSITIVE_SENTIMENT_RE.search(user_input):
+        return _GENERAL_RESPONSES[0]
+    elif _NEGATIVE_SENTIMENT_RE.search(user_input):
+        return _GENERAL_RESPONSES[1]
+    return _GENERAL_RESPONSES[2]
+
+# Short replies ("ok", "not sure") repeat across sessions
+_cached_general_response = functools.lru_cache(maxsize=512)(_select_general_response)
+
+def _general_response_for(user_input: str) -> str:
+    """Sentiment-based response, memoized on the lowercased input for short messages"""
+    if len(user_input) > GENERAL_RESPONSE_CACHE_MAX_INPUT:
+        return _select_general_response(user_input)
+    return _cached_general_response(user_input.lower())
+
+@functools.lru_cache(maxsize=256)
+def _content_label(content_type: str) -> str:
+    """Display label for a content requirement key, e.g. instagram_post -> Instagram Post"""
+    return content_type.replace('_', ' ').title()
+
+def _compile_template(template: str) -> Callable[..., str]:
+    """Turn a str.format template into an equivalent f-string function taking its fields as keywords"""
+    fields = []
+    for _, field_name, _, _ in string.Formatter().parse(template):
+        if field_name is not None and field_name not in fields:
+            if not field_name.isidentifier():
+                raise ValueError(f"Unsupported template field: {field_name!r}")
+            fields.append(field_name)
+    
+    params = f"*, {', '.join(fields)}" if fields else ""
+    namespace: Dict[str, Any] = {}
+    exec(f"def _render({params}):\n    return f{template!r}", namespace)
+    return namespace["_render"]
+
+@functools.lru_cache(maxsize=RENDERED_MESSAGE_CACHE_SIZE)
+def _render_cached(render: Callable[..., str], **fields: Any) -> str:
+    """Render a compiled template once per distinct set of field values"""
+    return render(**fields)
+
+def _with_session_lock(method):
+    """Run a handler method while holding the lock stripe of its session_id argument"""
+    @functools.wraps(method)
+    def wrapper(self, session_id: str, *args, **kwargs):
+        with self._session_lock(session_id):
+            return method(self, session_id, *args, **kwargs)
+    return wrapper
+
+@dataclass(slots=True)
+class _ConversationColumns:
+    """Conversation history stored column-wise: one bounded deque per field instead of a dict per message"""
+    roles: Deque[str] = field(default_factory=lambda: deque(maxlen=CONVERSATION_HISTORY_LIMIT))
+    messages: Deque[str] = field(default_factory=lambda: deque(maxlen=CONVERSATION_HISTORY_LIMIT))
+    # Epoch seconds; turned into ISO strings only when history is read
+    timestamps: Deque[float] = field(default_factory=lambda: deque(maxlen=CONVERSATION_HISTORY_LIMIT))
+
+    def append(self, role: str, message: str, timestamp: float) -> None:
+        self.roles.append(role)
+        self.messages.append(message)
+        self.timestamps.append(timestamp)
+
+    def to_dicts(self) -> List[Dict[str, str]]:
+        """Materialize the API's list-of-dicts form, only when history is read"""
+        fromtimestamp = datetime.fromtimestamp
+        return [
+            {"role": role, "message": message, "timestamp": fromtimestamp(timestamp).isoformat()}
+            for role, message, timestamp in zip(self.roles, self.messages, self.timestamps)
+        ]
+
 class ConversationHandler:
-    def __init__(self):
-        """Handle conversation flow for brand-side negotiations."""
-        self.active_sessions: Dict[str, NegotiationState] = {}
-        
-        # Conversation templates for different stages - Agent represents the Brand
-        self.conversation_templates = {
-            "greeting": """Hello! I'm representing {brand_name} and I'm excited to discuss a potential collaboration opportunity with you.
+    # Conversation templates for different stages - Agent represents the Brand
+    conversation_templates = {
+        "greeting": """Hello! I'm representing {brand_name} and I'm excited to discuss a potential collaboration opportunity with you.
 
 We've reviewed your profile and believe you'd be a great fit for our upcoming campaign. Here's what we're looking for:
 
@@ -44,7 +267,7 @@ Based on our market research and your profile, we'd like to propose a collaborat
 
 Are you interested in learning more about this opportunity?""",
 
-            "market_analysis": """We've conducted a thorough analysis of current market rates for creators with your profile:
+        "market_analysis": """We've conducted a thorough analysis of current market rates for creators with your profile:
 
 📊 **Your Profile Highlights**:
 • Followers: {followers:,}
@@ -61,7 +284,7 @@ This offer reflects our research into fair market pricing while aligning with ou
 
 What are your thoughts on this proposal?""",
 
-            "proposal": """Here's our formal collaboration proposal:
+        "proposal": """Here's our formal collaboration proposal:
 
 📋 **Deliverables & Compensation**:
 {deliverables_breakdown}
@@ -76,7 +299,7 @@ This proposal has been carefully crafted to offer competitive compensation while
 
 Would you like to move forward with these terms, or are there specific aspects you'd like to discuss?""",
 
-            "counter_offer_response": """Thank you for your counter-proposal. Let me review this with our team's perspective:
+        "counter_offer_response": """Thank you for your counter-proposal. Let me review this with our team's perspective:
 
 **Your Request**: {counter_price}
 **Our Budget**: {our_price}
@@ -88,7 +311,7 @@ Would you like to move forward with these terms, or are there specific aspects y
 
 We value working with talented creators like yourself and want to find a solution that works for both parties. Can we explore some options to bridge this gap?""",
 
-            "agreement": """🎉 Excellent! We're thrilled to move forward with this partnership!
+        "agreement": """🎉 Excellent! We're thrilled to move forward with this partnership!
 
 **Final Agreement Summary**:
 {final_terms}
@@ -103,59 +326,44 @@ On behalf of {brand_name}, I'm excited about the content you'll create for our c
 
 Welcome to the {brand_name} family! Is there anything else you need from us to get started?""",
 
-            "rejection_response": """I understand and respect your decision. While we're disappointed this particular opportunity isn't the right fit, we appreciate you taking the time to consider our proposal.
+        "rejection_response": """I understand and respect your decision. While we're disappointed this particular opportunity isn't the right fit, we appreciate you taking the time to consider our proposal.
 
 {brand_name} values building long-term relationships with quality creators. If your circumstances change or if you'd be interested in exploring different campaign formats in the future, we'd love to reconnect.
 
 Thank you for your professionalism throughout this process. We wish you all the best with your upcoming projects!
 
 Feel free to reach out if you'd like to discuss future collaboration opportunities."""
-        }
+    }
+
+    # Templates compiled once at import into f-string functions, shared by every handler instance
+    _compiled_templates: Dict[str, Callable[..., str]] = {
+        name: _compile_template(template) for name, template in conversation_templates.items()
+    }
+
+    def __init__(self):
+        """Handle conversation flow for brand-side negotiations."""
+        # session_id → state, least recently used first
+        self.active_sessions: "OrderedDict[str, NegotiationState]" = OrderedDict()
+        # session_id → conversation history, kept here rather than as dicts on NegotiationState
+        self._conversations: Dict[str, _ConversationColumns] = {}
+        # session_id → monotonic time of last use, in the same order as active_sessions
+        self._last_access: Dict[str, float] = {}
+        # Guards the session dicts themselves; per-session state is guarded by the striped locks.
+        # Stripes are re-entrant because generate_proposal can fall back to generate_market_analysis.
+        self._sessions_lock = threading.Lock()
+        self._lock_stripes = [threading.RLock() for _ in range(SESSION_LOCK_STRIPES)]
 
     def _format_currency(self, amount: float, currency: str) -> str:
         """Simple currency formatting."""
-        currency_symbols = {
-            'USD': '$', 'EUR': '€', 'GBP': '£', 'JPY': '¥',
-            'CAD': 'C$', 'AUD': 'A$', 'CHF': 'CHF ', 'CNY': '¥',
-            'INR': '₹', 'BRL': 'R$', 'MXN': 'MX$', 'KRW': '₩'
-        }
-        
-        symbol = currency_symbols.get(currency, f'{currency} ')
-        
-        if currency in ['JPY', 'KRW']:
-            return f"{symbol}{amount:,.0f}"
-        else:
-            return f"{symbol}{amount:,.2f}"
+        return _format_currency(amount, currency)
 
     def _convert_from_usd(self, amount: float, to_currency: str) -> float:
         """Simple fallback currency conversion from USD."""
-        if to_currency == 'USD':
-            return amount
-        
-        # Approximate exchange rates
-        rates_from_usd = {
-            'EUR': 0.85, 'GBP': 0.79, 'CAD': 1.35, 'AUD': 1.52,
-            'JPY': 150.0, 'INR': 83.0, 'BRL': 5.0, 'MXN': 18.0,
-            'CHF': 0.91, 'CNY': 7.2, 'KRW': 1320.0
-        }
-        
-        rate = rates_from_usd.get(to_currency, 1.0)
-        return amount * rate
+        return _convert_from_usd(amount, to_currency)
 
     def _convert_to_usd(self, amount: float, from_currency: str) -> float:
         """Simple fallback currency conversion to USD."""
-        if from_currency == 'USD':
-            return amount
-        
-        # Approximate exchange rates
-        rates_to_usd = {
-            'EUR': 1.18, 'GBP': 1.27, 'CAD': 0.74, 'AUD': 0.66,
-            'JPY': 0.0067, 'INR': 0.012, 'BRL': 0.20, 'MXN': 0.055,
-            'CHF': 1.10, 'CNY': 0.14, 'KRW': 0.00076
-        }
-        
-        rate = rates_to_usd.get(from_currency, 1.0)
-        return amount * rate
+        return _convert_to_usd(amount, from_currency)
 
     def _generate_budget_constrained_proposal_fixed(
         self, 
@@ -202,13 +410,32 @@ Feel free to reach out if you'd like to discuss future collaboration opportuniti
             "currency": brand_currency
         }
 
+    def _format_breakdown(self, content_breakdown: Dict[str, Any], brand_currency: str) -> Tuple[List[str], float]:
+        """Format per-content lines in the brand currency, returning them with the converted total"""
+        lines = []
+        total_brand_currency = 0
+        format_currency = self._format_currency
+        # One rate lookup for the whole breakdown instead of two conversions per item
+        rate = _rate_from_usd(brand_currency)
+        
+        for content_type, details in content_breakdown.items():
+            unit_rate = float(details['rate_per_piece']) * rate
+            total = float(details['total']) * rate
+            
+            lines.append(
+                f"• {_content_label(content_type)}: {format_currency(unit_rate, brand_currency)} × {details['count']} = {format_currency(total, brand_currency)}"
+            )
+            total_brand_currency += total
+        
+        return lines, total_brand_currency
+
     def create_session(
         self, 
         brand_details: BrandDetails, 
         influencer_profile: InfluencerProfile
     ) -> str:
         """Create a new negotiation session."""
-        session_id = str(uuid.uuid4())
+        session_id = secrets.token_urlsafe(16)
         
         negotiation_state = NegotiationState(
             session_id=session_id,
@@ -217,12 +444,21 @@ Feel free to reach out if you'd like to discuss future collaboration opportuniti
             status=NegotiationStatus.INITIATED
         )
         
-        self.active_sessions[session_id] = negotiation_state
+        with self._sessions_lock:
+            self._expire_idle_sessions(time.monotonic())
+            self.active_sessions[session_id] = negotiation_state
+            self._conversations[session_id] = _ConversationColumns()
+            self._last_access[session_id] = time.monotonic()
+            if len(self.active_sessions) > MAX_ACTIVE_SESSIONS:
+                evicted_id, _ = self.active_sessions.popitem(last=False)
+                self._conversations.pop(evicted_id, None)
+                self._last_access.pop(evicted_id, None)
         return session_id
 
+    @_with_session_lock
     def generate_greeting_message(self, session_id: str) -> str:
         """Generate the initial greeting message."""
-        session = self.active_sessions.get(session_id)
+        session = self._get_session(session_id)
         if not session:
             return "Session not found."
         
@@ -231,28 +467,23 @@ Feel free to reach out if you'd like to discuss future collaboration opportuniti
         
         # SIMPLIFIED CURRENCY LOGIC: Use brand's specified currency throughout
         # The brand's budget and currency are used as-is, no conversions
-        if hasattr(brand, 'budget_currency') and brand.budget_currency:
-            display_currency = brand.budget_currency
-            print(f"Brand budget currency: {display_currency}")
-            budget_display = brand.budget  # Use budget as-is in the specified currency
-            print(f"Brand budget: {budget_display}")
-        else:
-            # Fallback to USD if no currency specified
-            display_currency = "USD"
-            budget_display = brand.budget
+        display_currency = _brand_currency(brand)
+        budget_display = brand.budget  # Use budget as-is in the specified currency
 
         budget_formatted = self._format_currency(budget_display, display_currency)
 
         # Create content summary
         content_summary = []
         for content_type, quantity in brand.content_requirements.items():
-            content_summary.append(f"{quantity}x {content_type.replace('_', ' ').title()}")
+            content_summary.append(f"{quantity}x {_content_label(content_type)}")
         
-        message = self.conversation_templates["greeting"].format(
+        # Many influencers are pitched the same brand, so identical greetings are reused
+        message = _render_cached(
+            self._compiled_templates["greeting"],
             brand_name=brand.name,
             goals=", ".join(brand.goals),
             budget=budget_formatted,
-            platforms=", ".join([p.value.title() for p in brand.target_platforms]),
+            platforms=brand.target_platforms_display,
             content_summary=", ".join(content_summary),
             duration=brand.campaign_duration_days
         )
@@ -260,9 +491,10 @@ Feel free to reach out if you'd like to discuss future collaboration opportuniti
         self._add_to_conversation(session_id, "assistant", message)
         return message
 
+    @_with_session_lock
     def generate_market_analysis(self, session_id: str) -> str:
         """Generate market analysis message using brand's specified currency throughout."""
-        session = self.active_sessions.get(session_id)
+        session = self._get_session(session_id)
         if not session:
             return "Session not found."
         
@@ -270,12 +502,8 @@ Feel free to reach out if you'd like to discuss future collaboration opportuniti
         brand = session.brand_details
         
         # SIMPLIFIED: Use brand's currency for all calculations and display
-        if hasattr(brand, 'budget_currency') and brand.budget_currency:
-            brand_currency = brand.budget_currency
-            brand_budget = brand.budget  # Use as-is in brand currency
-        else:
-            brand_currency = "USD"
-            brand_budget = brand.budget
+        brand_currency = _brand_currency(brand)
+        brand_budget = brand.budget  # Use as-is in brand currency
 
         # For pricing service compatibility, we may need to pass USD values
         # Convert to USD only if needed for internal calculations
@@ -299,46 +527,13 @@ Feel free to reach out if you'd like to discuss future collaboration opportuniti
             return f"I apologize, but I encountered an issue generating the proposal: {budget_proposal['error']}"
         
         # Convert all values to brand's specified currency for display
-        rate_breakdown_lines = []
-        total_brand_currency = 0
-        
-        for content_type, details in budget_proposal["breakdown"].items():
-            content_display = content_type.replace('_', ' ').title()
-            
-            # Extract numeric values from the pricing service output
-            unit_rate_usd = float(details['rate_per_piece'])
-            total_usd = float(details['total'])
-            quantity = details['count']
-            
-            # Convert to brand currency
-            if brand_currency == "USD":
-                unit_rate_display = unit_rate_usd
-                total_display = total_usd
-            else:
-                unit_rate_display = self._convert_from_usd(unit_rate_usd, brand_currency)
-                total_display = self._convert_from_usd(total_usd, brand_currency)
-            
-            # Format in brand currency
-            unit_rate_formatted = self._format_currency(unit_rate_display, brand_currency)
-            total_formatted = self._format_currency(total_display, brand_currency)
-            
-            rate_breakdown_lines.append(
-                f"• {content_display}: {unit_rate_formatted} × {quantity} = {total_formatted}"
-            )
-            
-            total_brand_currency += total_display
+        rate_breakdown_lines, total_brand_currency = self._format_breakdown(budget_proposal["breakdown"], brand_currency)
         
         # Format total in brand currency
         total_formatted = self._format_currency(total_brand_currency, brand_currency)
         
         # Add cultural context based on location
-        cultural_note = ""
-        if influencer.location == LocationType.INDIA:
-            cultural_note = "\n\n🤝 **Partnership Approach**: We believe in building long-term relationships with talented creators like yourself. This budget allocation reflects our commitment to fair compensation while ensuring campaign success."
-        elif influencer.location == LocationType.US:
-            cultural_note = "\n\n📊 **Market Alignment**: Our budget allocation is competitive with current market standards and designed for optimal ROI."
-        elif influencer.location == LocationType.BRAZIL:
-            cultural_note = "\n\n🌟 **Collaboration Focus**: We're excited about the creative potential of this partnership and have allocated our budget to support your artistic vision."
+        cultural_note = _CULTURAL_NOTES.get(influencer.location, "")
         
         # Store the proposal in session (convert back to USD for internal storage)
         session.current_offer = NegotiationOffer(
@@ -351,11 +546,11 @@ Feel free to reach out if you'd like to discuss future collaboration opportuniti
             revisions_included=2
         )
         
-        message = self.conversation_templates["market_analysis"].format(
+        message = self._compiled_templates["market_analysis"](
             followers=influencer.followers,
             engagement_rate=influencer.engagement_rate,
             location=influencer.location.value,
-            platforms=", ".join([p.value.title() for p in influencer.platforms]),
+            platforms=influencer.platforms_display,
             rate_breakdown="\n".join(rate_breakdown_lines),
             total_value=total_formatted
         ) + cultural_note + f"\n\n💰 **Budget Allocation**: This proposal utilizes our full allocated budget of {self._format_currency(brand_budget, brand_currency)} to provide you with competitive compensation."
@@ -363,9 +558,10 @@ Feel free to reach out if you'd like to discuss future collaboration opportuniti
         self._add_to_conversation(session_id, "assistant", message)
         return message
 
+    @_with_session_lock
     def generate_proposal(self, session_id: str) -> str:
         """Generate formal proposal message using brand's specified currency."""
-        session = self.active_sessions.get(session_id)
+        session = self._get_session(session_id)
         if not session:
             return "Session not found."
         
@@ -373,10 +569,7 @@ Feel free to reach out if you'd like to discuss future collaboration opportuniti
         brand = session.brand_details
         
         # Use brand's specified currency
-        if hasattr(brand, 'budget_currency') and brand.budget_currency:
-            brand_currency = brand.budget_currency
-        else:
-            brand_currency = "USD"
+        brand_currency = _brand_currency(brand)
         
         # Use existing offer or create new one
         if not hasattr(session, 'current_offer') or session.current_offer is None:
@@ -386,47 +579,16 @@ Feel free to reach out if you'd like to discuss future collaboration opportuniti
         offer = session.current_offer
         print(f"Offer: {offer}")
         # Format deliverables breakdown in brand currency
-        deliverables_lines = []
-        total_brand_currency = 0
-        
-        for content_type, details in offer.content_breakdown.items():
-            content_display = content_type.replace('_', ' ').title()
-            
-            # Extract values and convert to brand currency
-            print(f"Details: {details}")
-            unit_rate_usd = float(details['rate_per_piece'])
-            total_usd = float(details['total'])
-            quantity = details['count']
-            
-            if brand_currency == "USD":
-                unit_rate_display = unit_rate_usd
-                total_display = total_usd
-            else:
-                unit_rate_display = self._convert_from_usd(unit_rate_usd, brand_currency)
-                total_display = self._convert_from_usd(total_usd, brand_currency)
-            
-            unit_rate_formatted = self._format_currency(unit_rate_display, brand_currency)
-            total_formatted = self._format_currency(total_display, brand_currency)
-            
-            deliverables_lines.append(
-                f"• {content_display}: {unit_rate_formatted} × {quantity} = {total_formatted}"
-            )
-            
-            total_brand_currency += total_display
+        deliverables_lines, total_brand_currency = self._format_breakdown(offer.content_breakdown, brand_currency)
         
         # Location-appropriate payment terms
-        if influencer.location == LocationType.INDIA:
-            payment_terms = "50% advance, 50% on completion (milestone-based as preferred in Indian market)"
-        elif influencer.location == LocationType.US:
-            payment_terms = "50% upfront, 50% within NET-30 terms"
-        else:
-            payment_terms = "50% advance, 50% on completion"
+        payment_terms = _PAYMENT_TERMS.get(influencer.location, _DEFAULT_PAYMENT_TERMS)
         
         total_formatted = self._format_currency(total_brand_currency, brand_currency)
         
         session.status = NegotiationStatus.IN_PROGRESS
         
-        message = self.conversation_templates["proposal"].format(
+        message = self._compiled_templates["proposal"](
             deliverables_breakdown="\n".join(deliverables_lines),
             total_price=total_formatted,
             payment_terms=payment_terms,
@@ -439,27 +601,28 @@ Feel free to reach out if you'd like to discuss future collaboration opportuniti
         self._add_to_conversation(session_id, "assistant", message)
         return message
 
+    @_with_session_lock
     def handle_user_response(self, session_id: str, user_input: str) -> str:
         """Handle user response and generate appropriate reply."""
-        session = self.active_sessions.get(session_id)
+        session = self._get_session(session_id)
         if not session:
             return "Session not found."
         
         self._add_to_conversation(session_id, "user", user_input)
         
-        # Analyze user intent
-        user_input_lower = user_input.lower()
+        # Analyze user intent in one regex pass
+        intent = _classify_intent(user_input)
         
-        if any(word in user_input_lower for word in ['accept', 'agree', 'deal', 'yes', 'perfect', 'sounds good']):
+        if intent == 'accept':
             return self._handle_acceptance(session_id)
         
-        elif any(word in user_input_lower for word in ['reject', 'decline', 'no', 'not interested', 'pass']):
+        elif intent == 'reject':
             return self._handle_rejection(session_id)
         
-        elif any(word in user_input_lower for word in ['counter', 'offer', 'suggest', '$', 'price', 'rate']):
+        elif intent == 'counter':
             return self._handle_counter_offer(session_id, user_input)
         
-        elif any(word in user_input_lower for word in ['question', 'clarify', 'explain', 'details', 'more info']):
+        elif intent == 'clarify':
             return self._handle_clarification(session_id, user_input)
         
         else:
@@ -468,85 +631,61 @@ Feel free to reach out if you'd like to discuss future collaboration opportuniti
     def _handle_acceptance(self, session_id: str) -> str:
         """Handle user acceptance of offer."""
         session = self.active_sessions[session_id]
+        offer = session.current_offer
         session.status = NegotiationStatus.AGREED
-        session.agreed_terms = session.current_offer
+        session.agreed_terms = offer
         
         # Use brand's specified currency for final terms
         brand = session.brand_details
-        if hasattr(brand, 'budget_currency') and brand.budget_currency:
-            brand_currency = brand.budget_currency
-        else:
-            brand_currency = "USD"
+        brand_name = brand.name
+        brand_currency = _brand_currency(brand)
         
         # Format final terms in brand currency
         final_terms_lines = []
-        if session.current_offer:
-            if session.current_offer.content_breakdown:
-                total_brand_currency = 0
-                
-                for content_type, details in session.current_offer.content_breakdown.items():
-                    content_display = content_type.replace('_', ' ').title()
-                    
-                    # Convert to brand currency
-                    unit_rate_usd = float(details['rate_per_piece'])
-                    total_usd = float(details['total'])
-                    quantity = details['count']
-                    
-                    if brand_currency == "USD":
-                        unit_rate_display = unit_rate_usd
-                        total_display = total_usd
-                    else:
-                        unit_rate_display = self._convert_from_usd(unit_rate_usd, brand_currency)
-                        total_display = self._convert_from_usd(total_usd, brand_currency)
-                    
-                    unit_rate_formatted = self._format_currency(unit_rate_display, brand_currency)
-                    total_formatted = self._format_currency(total_display, brand_currency)
-                    
-                    final_terms_lines.append(
-                        f"• {content_display}: {unit_rate_formatted} × {quantity} = {total_formatted}"
-                    )
-                    
-                    total_brand_currency += total_display
+        if offer:
+            if offer.content_breakdown:
+                final_terms_lines, total_brand_currency = self._format_breakdown(
+                    offer.content_breakdown, brand_currency
+                )
                 
                 total_formatted = self._format_currency(total_brand_currency, brand_currency)
                 
                 final_terms_lines.extend([
                     f"• Total Investment: {total_formatted}",
-                    f"• Payment Terms: {session.current_offer.payment_terms}",
-                    f"• Campaign Duration: {session.current_offer.timeline_days} days",
-                    f"• Usage Rights: {session.current_offer.usage_rights}"
+                    f"• Payment Terms: {offer.payment_terms}",
+                    f"• Campaign Duration: {offer.timeline_days} days",
+                    f"• Usage Rights: {offer.usage_rights}"
                 ])
         
         # Generate digital contract
         contract_service = get_contract_service()
         try:
             if contract_service:
+                # Contact details are left to the contract service's defaults (legal@<brand>.com etc.)
                 contract = contract_service.generate_contract(
                     session_id=session_id,
-                    negotiation_state=session,
-                    brand_contact_email=f"legal@{session.brand_details.name.lower().replace(' ', '')}.com",
-                    brand_contact_name=f"{session.brand_details.name} Legal Team",
-                    influencer_email=f"{session.influencer_profile.name.lower().replace(' ', '.')}@email.com",
-                    influencer_contact="+1-XXX-XXX-XXXX"
+                    negotiation_state=session
                 )
                 
-                contract_info = f"\n\n📄 **Digital Contract Generated!**\n"
-                contract_info += f"Contract ID: `{contract.contract_id}`\n"
-                contract_info += f"Status: {contract.status.value.replace('_', ' ').title()}\n"
-                contract_info += f"Ready for signatures from both parties.\n"
-                contract_info += f"\n🔗 You can view and sign the contract using the contract ID above."
+                contract_info = "".join([
+                    "\n\n📄 **Digital Contract Generated!**\n",
+                    f"Contract ID: `{contract.contract_id}`\n",
+                    f"Status: {_CONTRACT_STATUS_LABELS[contract.status]}\n",
+                    "Ready for signatures from both parties.\n",
+                    "\n🔗 You can view and sign the contract using the contract ID above."
+                ])
                 
                 logger.info(f"Contract {contract.contract_id} generated for session {session_id}")
             else:
-                contract_info = f"\n\n📄 **Contract Generation**: Our legal team will prepare the digital contract within 2 business days."
+                contract_info = _CONTRACT_PENDING_NOTE
             
         except Exception as e:
             logger.error(f"Failed to generate contract for session {session_id}: {e}")
-            contract_info = f"\n\n📄 **Contract Generation**: Our legal team will prepare the digital contract within 2 business days."
+            contract_info = _CONTRACT_PENDING_NOTE
         
-        message = self.conversation_templates["agreement"].format(
+        message = self._compiled_templates["agreement"](
             final_terms="\n".join(final_terms_lines),
-            brand_name=session.brand_details.name
+            brand_name=brand_name
         ) + contract_info
         
         self._add_to_conversation(session_id, "assistant", message)
@@ -557,7 +696,8 @@ Feel free to reach out if you'd like to discuss future collaboration opportuniti
         session = self.active_sessions[session_id]
         session.status = NegotiationStatus.REJECTED
         
-        message = self.conversation_templates["rejection_response"].format(
+        message = _render_cached(
+            self._compiled_templates["rejection_response"],
             brand_name=session.brand_details.name
         )
         
@@ -571,17 +711,15 @@ Feel free to reach out if you'd like to discuss future collaboration opportuniti
         session.negotiation_round += 1
         
         brand = session.brand_details
+        location = session.influencer_profile.location
+        format_currency = self._format_currency
         
         # Use brand's specified currency for all negotiations
-        if hasattr(brand, 'budget_currency') and brand.budget_currency:
-            brand_currency = brand.budget_currency
-            brand_budget = brand.budget  # Use as-is in brand currency
-        else:
-            brand_currency = "USD"
-            brand_budget = brand.budget
+        brand_currency = _brand_currency(brand)
+        brand_budget = brand.budget  # Use as-is in brand currency
         
         # Extract price from user input (assume it's in the same currency context)
-        price_match = re.search(r'[₹$€£¥]?(\d+(?:,\d{3})*(?:\.\d{2})?)', user_input.replace(',', ''))
+        price_match = _PRICE_RE.search(user_input.replace(',', ''))
         counter_price_input = float(price_match.group(1)) if price_match else None
         
         if counter_price_input:
@@ -591,9 +729,9 @@ Feel free to reach out if you'd like to discuss future collaboration opportuniti
             difference = abs(counter_price - our_price)
             
             # Format values in brand currency
-            our_price_formatted = self._format_currency(our_price, brand_currency)
-            counter_price_formatted = self._format_currency(counter_price, brand_currency)
-            difference_formatted = self._format_currency(difference, brand_currency)
+            our_price_formatted = format_currency(our_price, brand_currency)
+            counter_price_formatted = format_currency(counter_price, brand_currency)
+            difference_formatted = format_currency(difference, brand_currency)
             
             # Maximum 10% flexibility above budget
             max_allowable = brand_budget * 1.10
@@ -604,12 +742,13 @@ Feel free to reach out if you'd like to discuss future collaboration opportuniti
                 compromise_suggestion = f"We'll proceed with {counter_price_formatted} as agreed. This demonstrates our commitment to building a strong partnership with you."
                 
                 # Update offer to the accepted amount
-                if hasattr(session, 'current_offer') and session.current_offer:
+                offer = session.current_offer
+                if offer:
                     # Convert back to USD for internal storage if needed
                     if brand_currency == "USD":
-                        session.current_offer.total_price = counter_price
+                        offer.total_price = counter_price
                     else:
-                        session.current_offer.total_price = self._convert_to_usd(counter_price, brand_currency)
+                        offer.total_price = self._convert_to_usd(counter_price, brand_currency)
                 
                 session.status = NegotiationStatus.AGREED
                 
@@ -619,24 +758,19 @@ Feel free to reach out if you'd like to discuss future collaboration opportuniti
                 analysis_response = f"Your request of {counter_price_formatted} is {overage_percent:.1f}% above our allocated budget of {our_price_formatted}."
                 
                 # Cultural response based on location
-                if session.influencer_profile.location == LocationType.INDIA:
-                    middle_price = (our_price + counter_price) / 2
-                    compromise_suggestion = f"We appreciate your professional approach! Let's meet in the middle. How about {self._format_currency(middle_price, brand_currency)}? This shows our commitment to building a long-term partnership."
-                elif session.influencer_profile.location == LocationType.US:
-                    stretch_price = min(counter_price, max_allowable)
-                    compromise_suggestion = f"Given your quality portfolio, we can stretch our budget slightly. Would {self._format_currency(stretch_price, brand_currency)} work for you?"
-                else:
-                    solution_price = (our_price + min(counter_price, max_allowable)) / 2
-                    compromise_suggestion = f"We value this collaboration. Let's find a solution at {self._format_currency(solution_price, brand_currency)}?"
+                compromise_price, suggestion = _FLEX_COMPROMISES.get(location, _DEFAULT_FLEX_COMPROMISE)
+                compromise_suggestion = suggestion.format(
+                    price=format_currency(compromise_price(our_price, counter_price, max_allowable), brand_currency)
+                )
                 
             else:
                 # Counter-offer exceeds maximum allowable budget
                 overage_amount = counter_price - max_allowable
-                overage_formatted = self._format_currency(overage_amount, brand_currency)
+                overage_formatted = format_currency(overage_amount, brand_currency)
                 
                 analysis_response = f"Your request of {counter_price_formatted} exceeds our campaign budget by {overage_formatted}."
                 
-                max_offer_formatted = self._format_currency(max_allowable, brand_currency)
+                max_offer_formatted = format_currency(max_allowable, brand_currency)
                 compromise_suggestion = f"Our absolute maximum for this campaign is {max_offer_formatted}. Beyond this, we'd need to reduce content scope or explore a different campaign structure. Would the maximum budget work, or should we consider alternative approaches?"
                 
         else:
@@ -644,12 +778,12 @@ Feel free to reach out if you'd like to discuss future collaboration opportuniti
             analysis_response = "I'd love to discuss your thoughts on the proposal."
             compromise_suggestion = "Could you share your budget expectations so we can find the best path forward?"
             
-            our_price_formatted = self._format_currency(brand_budget, brand_currency)
+            our_price_formatted = format_currency(brand_budget, brand_currency)
             counter_price_formatted = "Not specified"
             difference_formatted = "N/A"
         
         # Generate response using template
-        message = self.conversation_templates["counter_offer_response"].format(
+        message = self._compiled_templates["counter_offer_response"](
             counter_price=counter_price_formatted,
             our_price=our_price_formatted,
             difference=difference_formatted,
@@ -662,54 +796,63 @@ Feel free to reach out if you'd like to discuss future collaboration opportuniti
 
     def _handle_clarification(self, session_id: str, user_input: str) -> str:
         """Handle clarification questions."""
-        clarification_response = """I'm happy to clarify any details! Here are some key points that might help:
-
-📋 **Content Deliverables**: Each piece includes concept development, creation, editing, and posting
-🔄 **Revision Process**: 2 rounds of revisions included to ensure content meets brand guidelines
-📅 **Timeline**: Flexible scheduling with milestone-based delivery
-💳 **Payment**: Secure payment processing with clear terms
-🎯 **Brand Guidelines**: Detailed brief provided to ensure authentic content creation
-📊 **Performance**: Optional performance reporting available
-
-What specific aspect would you like me to explain further?"""
-        
-        self._add_to_conversation(session_id, "assistant", clarification_response)
-        return clarification_response
+        self._add_to_conversation(session_id, "assistant", _CLARIFICATION_RESPONSE)
+        return _CLARIFICATION_RESPONSE
 
     def _handle_general_response(self, session_id: str, user_input: str) -> str:
         """Handle general conversational responses."""
-        responses = [
-            "That's a great point! I want to make sure we create a collaboration that truly works for you. What aspects are most important to you in this partnership?",
-            "I appreciate your perspective! Let's make sure we address all your concerns. What would make this opportunity more appealing for you?",
-            "Absolutely! Building the right partnership is crucial. What elements would you like to discuss or adjust in our proposal?",
-            "I'm here to make this as smooth as possible for you. What questions or suggestions do you have about the collaboration structure?"
-        ]
-        
-        # Simple sentiment-based response selection
-        if any(word in user_input.lower() for word in ['excited', 'interested', 'love', 'great']):
-            response = responses[0]
-        elif any(word in user_input.lower() for word in ['concerned', 'worried', 'unsure']):
-            response = responses[1]
-        else:
-            response = responses[2]
+        response = _general_response_for(user_input)
         
         self._add_to_conversation(session_id, "assistant", response)
         return response
 
     def _add_to_conversation(self, session_id: str, role: str, message: str):
         """Add message to conversation history."""
-        if session_id in self.active_sessions:
-            self.active_sessions[session_id].conversation_history.append({
-                "role": role,
-                "message": message,
-                "timestamp": datetime.now().isoformat()
-            })
-
+        # Callers hold this session's lock stripe; the dict lookup itself is atomic
+        conversation = self._conversations.get(session_id)
+        if conversation is not None:
+            conversation.append(role, message, time.time())
+
+    def _get_session(self, session_id: str) -> Optional[NegotiationState]:
+        """Look up a session and mark it as recently used."""
+        with self._sessions_lock:
+            now = time.monotonic()
+            self._expire_idle_sessions(now)
+            session = self.active_sessions.get(session_id)
+            if session is not None:
+                self.active_sessions.move_to_end(session_id)
+                self._last_access[session_id] = now
+        return session
+
+    def _expire_idle_sessions(self, now: float) -> None:
+        """Drop sessions idle past SESSION_IDLE_TTL_SECONDS; caller holds _sessions_lock"""
+        # active_sessions is ordered by last use, so expired sessions are all at the front
+        cutoff = now - SESSION_IDLE_TTL_SECONDS
+        while self.active_sessions:
+            oldest_id = next(iter(self.active_sessions))
+            if self._last_access.get(oldest_id, now) > cutoff:
+                break
+            del self.active_sessions[oldest_id]
+            self._conversations.pop(oldest_id, None)
+            self._last_access.pop(oldest_id, None)
+            logger.info(f"Expired idle negotiation session {oldest_id}")
+
+    def _session_lock(self, session_id: str) -> threading.RLock:
+        """Lock stripe for a session, so unrelated sessions rarely contend"""
+        return self._lock_stripes[hash(session_id) & (SESSION_LOCK_STRIPES - 1)]
+
+    @_with_session_lock
     def get_session_state(self, session_id: str) -> Optional[NegotiationState]:
-        """Get current session state."""
-        return self.active_sessions.get(session_id)
-
+        """Get current session state, with conversation_history filled in from the history columns."""
+        session = self._get_session(session_id)
+        if session is not None:
+            # History lives in _conversations; materialize the model field only when the state is read
+            conversation = self._conversations.get(session_id)
+            session.conversation_history = conversation.to_dicts() if conversation else []
+        return session
+
+    @_with_session_lock
     def get_conversation_history(self, session_id: str) -> List[Dict[str, str]]:
         """Get conversation history for session."""
-        session = self.active_sessions.get(session_id)
-        return session.conversation_history if session else []
+        conversation = self._conversations.get(session_id)
+        return conversation.to_dicts() if conversation else []
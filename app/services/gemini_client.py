@@ -0,0 +1,60 @@
+import importlib.util
+import logging
+import threading
+from typing import Any, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Keep-alive pool shared by every Gemini caller in the process
+MAX_KEEPALIVE_CONNECTIONS = 32
+
+_UNSET = object()
+_client: Any = _UNSET
+_client_lock = threading.Lock()
+
+
+def get_gemini_client() -> Optional[Any]:
+    """Get the process-wide Gemini client shared by AgentService and AIQueryParser, or None if unavailable"""
+    global _client
+    # Lock-free once built; the lock only serializes concurrent first use
+    if _client is _UNSET:
+        with _client_lock:
+            if _client is _UNSET:
+                _client = _create_gemini_client()
+    return _client
+
+
+def _create_gemini_client() -> Optional[Any]:
+    """Build the Gemini client with its API key passed per client, never via global configure"""
+    # GOOGLE_API_KEY is the documented variable; GEMINI_API_KEY is accepted for older .env files
+    api_key = settings.google_api_key or settings.gemini_api_key
+    if not api_key:
+        logger.warning("Gemini client unavailable - missing Google API key")
+        return None
+
+    try:
+        import httpx
+        from google import genai
+        from google.genai import types
+    except ImportError as e:
+        logger.warning(f"Missing dependencies for Gemini client: {e}")
+        return None
+
+    # Pooled keep-alive connections (HTTP/2 when h2 is installed) for both sync and async calls
+    transport_args = {
+        "http2": importlib.util.find_spec("h2") is not None,
+        "limits": httpx.Limits(max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS),
+    }
+
+    try:
+        return genai.Client(
+            api_key=api_key,
+            http_options=types.HttpOptions(
+                client_args=transport_args,
+                async_client_args=transport_args
+            )
+        )
+    except Exception as e:
+        logger.warning(f"Failed to initialize Gemini client: {e}")
+        return None
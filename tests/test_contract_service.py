@@ -0,0 +1,51 @@
+import pytest
+
+from app.models.negotiation_models import (
+    BrandDetails, InfluencerProfile, LocationType, NegotiationOffer,
+    NegotiationState, PlatformType
+)
+from app.services.contract_service import ContractGenerationService
+
+
+def _handler_state(session_id: str = "session-1") -> NegotiationState:
+    """Negotiation state agreed on an offer shaped like the conversation handler's: breakdown only, no deliverables"""
+    brand = BrandDetails(
+        name="Acme",
+        budget=1000,
+        goals=["awareness"],
+        target_platforms=[PlatformType.INSTAGRAM],
+        content_requirements={"instagram_post": 2},
+        brand_location=LocationType.INDIA
+    )
+    influencer = InfluencerProfile(
+        name="Jane Doe",
+        followers=10000,
+        engagement_rate=0.05,
+        location=LocationType.INDIA,
+        platforms=[PlatformType.INSTAGRAM]
+    )
+    state = NegotiationState(session_id=session_id, brand_details=brand, influencer_profile=influencer)
+    state.agreed_terms = NegotiationOffer(
+        total_price=500,
+        currency="INR",
+        content_breakdown={"instagram_post": {"count": 2, "rate_per_piece": 250, "total": 500}},
+        payment_terms="50% advance, 50% on completion",
+        timeline_days=brand.campaign_duration_days
+    )
+    return state
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.delenv("CONTRACT_STORE_DIR", raising=False)
+    return ContractGenerationService()
+
+
+def test_generate_contract_from_handler_offer_without_deliverables(service):
+    contract = service.generate_contract(session_id="session-1", negotiation_state=_handler_state())
+
+    assert contract.deliverables is None
+    assert service.get_contract_by_session("session-1") is contract
+    assert service.get_contract_summary(contract.contract_id)["deliverables_count"] == 0
+    assert [s["contract_id"] for s in service.list_contracts()] == [contract.contract_id]
+    assert "TOTAL COMPENSATION" in service.generate_contract_pdf_content(contract.contract_id)
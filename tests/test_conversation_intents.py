@@ -0,0 +1,37 @@
+import pytest
+
+from app.services.conversation_handler_fixed import _classify_intent
+
+
+@pytest.mark.parametrize("user_input, expected", [
+    # Acceptance, including inflections
+    ("Yes, sounds good", "accept"),
+    ("Agreed!", "accept"),
+    ("I accepted your terms", "accept"),
+    ("We're agreeing to this", "accept"),
+    ("Perfect, it's a deal", "accept"),
+    # Rejection
+    ("No thanks", "reject"),
+    ("I have declined similar offers", "reject"),
+    ("Rejected.", "reject"),
+    ("I'll pass", "reject"),
+    ("Not interested", "reject"),
+    # Counter-offers
+    ("I'd want $1,200 for this", "counter"),
+    ("What are you offering?", "counter"),
+    ("Can we talk about pricing", "counter"),
+    ("My rates are higher", "counter"),
+    # Clarification
+    ("Could you explain the details?", "clarify"),
+    ("One question about usage", "clarify"),
+    ("Need some clarification", "clarify"),
+    # Whole words only: substrings of other words do not count
+    ("I know what you mean", None),
+    ("Ideal. Let's see", None),
+    ("I'm excited!", None),
+    # Higher-priority intent wins when several match
+    ("Yes, but I'd like a better price", "accept"),
+    ("No, not at that rate", "reject"),
+])
+def test_classify_intent(user_input, expected):
+    assert _classify_intent(user_input) == expected